@@ -3,14 +3,17 @@ Genie AI Chatbot - Main Application
 A modular Streamlit chatbot for interacting with Databricks Genie API
 """
 import streamlit as st
+import uuid
 import logging
 from dotenv import load_dotenv
 
 # Import custom modules
 from modules.auth_handler import AzureAuthHandler
-from modules.genie_client import GenieClient
-from modules.response_formatter import ResponseFormatter
+from modules.genie_service import GenieService
 from modules.ui_components import UIComponents
+from modules.tracing import get_tracer, traced
+from modules.metrics import metrics, start_metrics_server
+from modules.config import Config
 
 # Setup logging
 logging.basicConfig(level=logging.INFO)
@@ -26,8 +29,7 @@ class GenieChatbot:
     def __init__(self):
         self.auth_handler = AzureAuthHandler()
         self.ui = UIComponents()
-        self.formatter = ResponseFormatter()
-        self.genie_client = None
+        self.genie_service = None
         
         # Initialize page configuration
         st.set_page_config(
@@ -39,6 +41,9 @@ class GenieChatbot:
     
     def initialize_session_state(self):
         """Initialize session state variables"""
+        if "session_id" not in st.session_state:
+            st.session_state.session_id = uuid.uuid4().hex
+        
         if "authenticated" not in st.session_state:
             st.session_state.authenticated = False
         
@@ -50,14 +55,28 @@ class GenieChatbot:
                 }
             ]
     
-    def initialize_genie_client(self):
-        """Initialize the Genie client if authenticated"""
-        if st.session_state.authenticated and "genie_client" not in st.session_state:
-            self.genie_client = GenieClient(st.session_state.oauth_token)
-            st.session_state.genie_client = self.genie_client
-        elif "genie_client" in st.session_state:
-            self.genie_client = st.session_state.genie_client
+    def initialize_genie_service(self):
+        """Initialize the Genie service if authenticated"""
+        if st.session_state.authenticated and "genie_service" not in st.session_state:
+            self.genie_service = GenieService(st.session_state.oauth_token)
+            st.session_state.genie_service = self.genie_service
+            if self.genie_service.init_error:
+                st.error(self.genie_service.init_error)
+        elif "genie_service" in st.session_state:
+            self.genie_service = st.session_state.genie_service
+    
+    def record_session_metrics(self):
+        """Report this session's activity and held result size to the metrics registry"""
+        result_bytes = sum(len(message["content"].encode("utf-8")) for message in st.session_state.messages)
+        charts = [item["chart"] for message in st.session_state.messages
+                  for item in [message, *message.get("sections", [])] if item.get("chart")]
+        if charts:
+            # Only imported once a chart exists, so numpy stays out of sessions without one
+            from modules.charting import chart_nbytes
+            result_bytes += sum(chart_nbytes(chart) for chart in charts)
+        metrics.sessions.touch(st.session_state.session_id, result_bytes=result_bytes)
     
+    @traced("ui.display_chat_messages")
     def display_chat_messages(self):
         """Display all chat messages"""
         for message in st.session_state.messages:
@@ -65,29 +84,66 @@ class GenieChatbot:
                 self.ui.render_user_message(message["content"])
             else:
                 self.ui.render_bot_message(message["content"])
+                self.render_result_extras(message)
+                # Merged fan-out answers keep a statement and chart per space
+                for section in message.get("sections", []):
+                    if section.get("statement_id") or section.get("chart"):
+                        st.caption(f"📂 {section['space']}")
+                        self.render_result_extras(section)
+    
+    def render_result_extras(self, result: dict):
+        """Render the chart and download buttons of an answer (a message or a merged section)"""
+        if result.get("chart") and st.session_state.get("auto_chart", True):
+            self.render_message_chart(result)
+        if result.get("statement_id") and self.genie_service:
+            self.ui.render_export_buttons(result["statement_id"], self.genie_service.export_result)
+    
+    def render_message_chart(self, result: dict):
+        """Render a chart, offering to redraw it from the full result when only inline rows were used"""
+        self.ui.render_chart(result["chart"])
+        if result["chart"].get("full", True) or not result.get("statement_id") or not self.genie_service:
+            return
+        if self.ui.render_full_chart_button(result["statement_id"]):
+            with st.spinner("📈 Lendo todas as linhas do resultado..."):
+                full_chart = self.genie_service.full_chart(result["statement_id"])
+            if full_chart is not None:
+                result["chart"] = full_chart
+            st.rerun()
     
     def handle_user_input(self, user_input: str):
         """Process user input and generate response"""
+        with get_tracer().start_as_current_span("chat.handle_user_input", question_length=len(user_input)):
+            self._handle_user_input(user_input)
+    
+    def _handle_user_input(self, user_input: str):
+        """Ask Genie and render the answer inside the request span"""
         # Add user message to chat
         st.session_state.messages.append({"role": "user", "content": user_input})
         
         # Display user message immediately
         self.ui.render_user_message(user_input)
         
-        # Check if Genie client is available
-        if not self.genie_client or not hasattr(self.genie_client, 'genie_api'):
+        # Check if Genie service is available
+        if not self.genie_service or not self.genie_service.available:
             error_msg = "❌ Genie client not available. Please check your configuration."
             st.session_state.messages.append({"role": "assistant", "content": error_msg})
             self.ui.render_error_message(error_msg)
             return
         
         # Get response from Genie
-        response = self.genie_client.ask_genie(user_input)
+        with self.ui.progress_indicator() as progress:
+            response = self.genie_service.ask(user_input, progress_callback=progress,
+                                              chart=st.session_state.get("auto_chart", True))
         
         if response.get("success"):
-            # Format the response using the formatter
-            formatted_response = self.formatter.process_query_results(response["response"])
-            st.session_state.messages.append({"role": "assistant", "content": formatted_response})
+            formatted_response = response["formatted"]
+            st.session_state.messages.append({
+                "role": "assistant",
+                "content": formatted_response,
+                "statement_id": response["response"].get("statement_id"),
+                "chart": response.get("chart"),
+                "sections": response.get("sections", [])
+            })
             self.ui.render_bot_message(formatted_response)
         else:
             error_msg = f"❌ **Erro:** {response.get('error', 'Erro desconhecido')}"
@@ -108,10 +164,17 @@ class GenieChatbot:
             st.session_state.welcome_shown = True
         
         # Render sidebar
-        self.ui.render_sidebar()
+        is_admin = Config.is_admin(st.session_state.get("user_email", ""))
+        self.ui.render_sidebar(is_admin=is_admin)
+        
+        # Show the admin panel instead of the chat when requested
+        if is_admin and st.session_state.get("show_admin_panel"):
+            self.ui.render_admin_panel(metrics.snapshot())
+            self.ui.render_footer()
+            return
         
-        # Initialize Genie client
-        self.initialize_genie_client()
+        # Initialize Genie service
+        self.initialize_genie_service()
         
         # Display chat messages
         self.display_chat_messages()
@@ -136,6 +199,7 @@ class GenieChatbot:
         """Main application entry point"""
         # Initialize session state
         self.initialize_session_state()
+        self.record_session_metrics()
         
         # Show authentication page if not authenticated
         if not st.session_state.authenticated:
@@ -149,6 +213,7 @@ class GenieChatbot:
 
 def main():
     """Application entry point"""
+    start_metrics_server()
     app = GenieChatbot()
     app.run()
 
@@ -0,0 +1,9 @@
+"""
+Genie AI Chatbot - Benchmark Suite
+
+Benchmarks for the request pipeline, the response formatter and the memory
+held by chat history. Results are written as JSON so runs can be compared:
+
+    python -m benchmarks.run_benchmarks --output results/current.json
+    python -m benchmarks.compare results/baseline.json results/current.json
+"""
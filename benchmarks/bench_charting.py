@@ -0,0 +1,34 @@
+"""
+Chart building (column extraction plus LTTB or min/max downsampling) across result sizes
+"""
+from typing import Dict, Any
+
+from mock_server import MockSettings, MockDataGenerator
+from modules.charting import detect_chart_columns, build_chart
+from .common import measure, single_value, INFORMATIONAL
+
+ROW_COUNTS = [1000, 10000, 100000, 500000]
+CHUNK_ROWS = 20000
+MAX_POINTS = 1000
+
+COLUMN_SETS = {
+    "time_single": [("event_time", "TIMESTAMP"), ("revenue", "DOUBLE")],
+    "time_multi": [("event_time", "TIMESTAMP"), ("orders", "BIGINT"), ("revenue", "DOUBLE"), ("margin", "DECIMAL")],
+    "numeric": [("orders", "BIGINT"), ("revenue", "DOUBLE")],
+}
+
+
+def run(quick: bool = False) -> Dict[str, Dict[str, Any]]:
+    """Run the charting benchmarks"""
+    repeat = 3 if quick else 10
+    row_counts = ROW_COUNTS[:3] if quick else ROW_COUNTS
+    results = {}
+    for name, columns in COLUMN_SETS.items():
+        data = MockDataGenerator(MockSettings(columns=columns))
+        spec = detect_chart_columns(data.schema()["columns"])
+        for rows in row_counts:
+            blocks = [data.rows(offset, min(CHUNK_ROWS, rows - offset)) for offset in range(0, rows, CHUNK_ROWS)]
+            key = f"chart.build[{name},rows={rows}]"
+            results[key] = measure(lambda: build_chart(spec, blocks, MAX_POINTS), repeat=repeat, warmup=1)
+            results[f"{key}.points"] = single_value(len(build_chart(spec, blocks, MAX_POINTS)["x"]), "points", INFORMATIONAL)
+    return results
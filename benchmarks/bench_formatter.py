@@ -0,0 +1,45 @@
+"""
+ResponseFormatter.process_query_results across result sizes and column types
+"""
+from typing import Dict, Any
+
+from mock_server import MockSettings, MockDataGenerator
+from modules.response_formatter import ResponseFormatter
+from .common import measure
+
+ROW_COUNTS = [20, 1000, 10000, 100000]
+
+COLUMN_SETS = {
+    "numeric": [("revenue", "DOUBLE"), ("orders", "BIGINT"), ("margin", "DECIMAL")],
+    "string": [("region", "STRING"), ("product", "STRING"), ("channel", "STRING")],
+    "mixed": [("event_time", "TIMESTAMP"), ("region", "STRING"), ("orders", "BIGINT"), ("revenue", "DOUBLE")],
+}
+
+
+def build_answer(rows: int, columns) -> Dict[str, Any]:
+    """Build a Genie answer in the shape GenieClient returns"""
+    data = MockDataGenerator(MockSettings(rows=rows, columns=columns))
+    return {
+        "columns": data.schema(),
+        "data": {"chunk_index": 0, "row_offset": 0, "row_count": rows, "data_array": data.rows(0, rows)},
+        "query_description": "benchmark"
+    }
+
+
+def run(quick: bool = False) -> Dict[str, Dict[str, Any]]:
+    """Run the formatter benchmarks"""
+    repeat = 10 if quick else 50
+    row_counts = ROW_COUNTS[:2] if quick else ROW_COUNTS
+    results = {}
+    for type_set, columns in COLUMN_SETS.items():
+        for rows in row_counts:
+            answer = build_answer(rows, columns)
+            results[f"formatter.process_query_results[types={type_set},rows={rows}]"] = measure(
+                lambda: ResponseFormatter.process_query_results(answer), repeat=repeat
+            )
+
+    message = {"message": "Resposta em texto " * 50}
+    results["formatter.process_query_results[message]"] = measure(
+        lambda: ResponseFormatter.process_query_results(message), repeat=repeat
+    )
+    return results
@@ -0,0 +1,59 @@
+"""
+Cold-start import time of the app and the Streamlit-free core
+
+Every sample imports in a fresh interpreter, so nothing is cached in
+sys.modules, and times only the import statement itself.
+"""
+import os
+import sys
+import json
+import subprocess
+from typing import Dict, Any
+
+from .common import summarize, single_value
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# What each entry point imports before it can do its first piece of work
+TARGETS = {
+    "app": "import app",
+    "core": "import modules.genie_service",
+    "cli": "import cli",
+}
+
+HEAVY_MODULES = ["streamlit", "databricks.sdk", "pandas", "pyarrow"]
+
+PROBE = """
+import sys, time, json
+start = time.perf_counter()
+{statement}
+elapsed = time.perf_counter() - start
+print(json.dumps({{"elapsed": elapsed, "loaded": [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+
+def probe(statement: str) -> Dict[str, Any]:
+    """Import in a fresh interpreter and report the elapsed time and heavy modules loaded"""
+    code = PROBE.format(statement=statement, heavy=HEAVY_MODULES)
+    env = dict(os.environ, METRICS_PORT="0", PYTHONDONTWRITEBYTECODE="1")
+    output = subprocess.run(
+        [sys.executable, "-c", code], cwd=ROOT, env=env, capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def run(quick: bool = False) -> Dict[str, Dict[str, Any]]:
+    """Run the import time benchmarks"""
+    repeat = 3 if quick else 10
+    results = {}
+    for name, statement in TARGETS.items():
+        samples = []
+        loaded = []
+        for _ in range(repeat):
+            report = probe(statement)
+            samples.append(report["elapsed"])
+            loaded = report["loaded"]
+        results[f"import.{name}"] = summarize(samples)
+        for module in HEAVY_MODULES:
+            results[f"import.{name}.loads[{module}]"] = single_value(int(module in loaded), "bool")
+    return results
@@ -0,0 +1,61 @@
+"""
+End-to-end GenieClient.ask_genie against the offline stand-in server
+"""
+import os
+from typing import Dict, Any
+
+from mock_server import MockServer, MockSettings
+from modules.tracing import get_tracer
+from .common import measure, quiet_streamlit
+
+SCENARIOS = {
+    "text": MockSettings(text_ratio=1.0),
+    "rows=100": MockSettings(rows=100),
+    "rows=10000": MockSettings(rows=10000),
+    "rows=10000,latency": MockSettings(rows=10000, latency={
+        "genie": "lognormal:50,0.3", "genie_get": "fixed:5", "statement": "uniform:10,30"
+    }),
+}
+
+
+def run(quick: bool = False) -> Dict[str, Dict[str, Any]]:
+    """Run the pipeline benchmarks, one stand-in server per scenario"""
+    from modules.genie_client import GenieClient
+
+    quiet_streamlit()
+    repeat = 5 if quick else 30
+    results = {}
+    tracer = get_tracer()
+    previous_env = dict(os.environ)
+
+    try:
+        for name, settings in SCENARIOS.items():
+            with MockServer(settings) as server:
+                os.environ.update(server.env())
+                client = GenieClient("benchmark-token")
+                for histogram in tracer.histograms().values():
+                    histogram.reset()
+
+                results[f"pipeline.ask_genie[{name}]"] = measure(
+                    lambda: client.ask_genie("Quantos registros existem?"), repeat=repeat, warmup=1
+                )
+                for stage, histogram in tracer.histograms().items():
+                    if histogram.count and stage.startswith(("genie.", "statement_execution.")):
+                        snapshot = histogram.snapshot()
+                        results[f"pipeline.stage[{name}].{stage}"] = {
+                            "unit": "ms",
+                            "samples": snapshot["count"],
+                            "mean": snapshot["mean_ms"],
+                            "median": snapshot["p50_ms"],
+                            "p95": snapshot["p95_ms"],
+                            "p99": snapshot["p99_ms"],
+                            "max": snapshot["max_ms"]
+                        }
+
+        with MockServer(MockSettings()) as server:
+            os.environ.update(server.env())
+            results["pipeline.client_init"] = measure(lambda: GenieClient("benchmark-token"), repeat=repeat)
+    finally:
+        os.environ.clear()
+        os.environ.update(previous_env)
+    return results
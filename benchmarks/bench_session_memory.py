@@ -0,0 +1,49 @@
+"""
+Memory held by chat history in session state
+"""
+import gc
+import tracemalloc
+from typing import Dict, Any, List
+
+from modules.response_formatter import ResponseFormatter
+from .bench_formatter import build_answer, COLUMN_SETS
+from .common import single_value
+
+TURN_COUNTS = [10, 50, 200]
+
+
+def build_history(turns: int, rows: int) -> List[Dict[str, Any]]:
+    """Build a chat history the way GenieChatbot appends to st.session_state.messages"""
+    messages = [{"role": "assistant", "content": "👋 Olá! Pergunte para AI/BI Databricks Genie! Pergunte para sua base de dados."}]
+    for turn in range(turns):
+        answer = build_answer(rows, COLUMN_SETS["mixed"])
+        messages.append({"role": "user", "content": f"Pergunta {turn}"})
+        messages.append({"role": "assistant", "content": ResponseFormatter.process_query_results(answer)})
+    return messages
+
+
+def traced_allocation(turns: int, rows: int) -> int:
+    """Bytes still allocated once the history is built and temporaries are freed"""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        messages = build_history(turns, rows)
+        gc.collect()
+        current, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del messages
+    return current
+
+
+def run(quick: bool = False) -> Dict[str, Dict[str, Any]]:
+    """Run the session memory benchmarks"""
+    results = {}
+    turn_counts = TURN_COUNTS[:2] if quick else TURN_COUNTS
+    for turns in turn_counts:
+        for rows in (20, 1000):
+            key = f"session.chat_history[turns={turns},rows={rows}]"
+            content_bytes = sum(len(m["content"].encode("utf-8")) for m in build_history(turns, rows))
+            results[f"{key}.content_bytes"] = single_value(content_bytes, "bytes")
+            results[f"{key}.allocated_bytes"] = single_value(traced_allocation(turns, rows), "bytes")
+    return results
@@ -0,0 +1,111 @@
+"""
+Shared helpers for the benchmark suite
+"""
+import gc
+import os
+import math
+import sys
+import time
+import json
+import logging
+import platform
+import subprocess
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Any
+
+
+def quiet_streamlit():
+    """Silence the bare-mode warnings Streamlit logs when used outside `streamlit run`"""
+    from streamlit import logger as streamlit_logger
+    streamlit_logger.set_log_level("error")
+    for name in list(logging.root.manager.loggerDict):
+        if name.startswith("streamlit"):
+            logging.getLogger(name).setLevel(logging.ERROR)
+    logging.getLogger("streamlit").setLevel(logging.ERROR)
+
+
+def percentile(sorted_samples: List[float], p: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_samples:
+        return 0.0
+    index = max(0, min(len(sorted_samples) - 1, math.ceil(p * len(sorted_samples) / 100.0) - 1))
+    return sorted_samples[index]
+
+
+# How compare.py judges a change in a result's median
+LOWER_IS_BETTER = "lower"
+HIGHER_IS_BETTER = "higher"
+INFORMATIONAL = "none"
+
+
+def summarize(samples: List[float], unit: str = "ms", scale: float = 1000.0,
+              direction: str = LOWER_IS_BETTER) -> Dict[str, Any]:
+    """Summarize raw samples (seconds by default) into the result format"""
+    values = sorted(s * scale for s in samples)
+    return {
+        "unit": unit,
+        "direction": direction,
+        "samples": len(values),
+        "min": round(values[0], 4),
+        "mean": round(sum(values) / len(values), 4),
+        "median": round(percentile(values, 50), 4),
+        "p95": round(percentile(values, 95), 4),
+        "p99": round(percentile(values, 99), 4),
+        "max": round(values[-1], 4)
+    }
+
+
+def measure(func: Callable[[], Any], repeat: int = 20, warmup: int = 2) -> Dict[str, Any]:
+    """Time repeated calls of func and summarize them in milliseconds"""
+    for _ in range(warmup):
+        func()
+    samples = []
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            func()
+            samples.append(time.perf_counter() - start)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+    return summarize(samples)
+
+
+def single_value(value: float, unit: str, direction: str = LOWER_IS_BETTER) -> Dict[str, Any]:
+    """Result entry for a benchmark that produces one number"""
+    return {"unit": unit, "direction": direction, "samples": 1, "median": value}
+
+
+def run_metadata() -> Dict[str, Any]:
+    """Describe the environment a run was taken in"""
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+            cwd=os.path.dirname(os.path.abspath(__file__))
+        ).stdout.strip()
+    except OSError:
+        commit = ""
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "git_commit": commit,
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count()
+    }
+
+
+def write_results(path: str, benchmarks: Dict[str, Dict[str, Any]]):
+    """Write a result file"""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"metadata": run_metadata(), "benchmarks": benchmarks}, f, indent=2, sort_keys=True)
+
+
+def load_results(path: str) -> Dict[str, Any]:
+    """Read a result file"""
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
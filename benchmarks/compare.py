@@ -0,0 +1,84 @@
+"""
+Compare two benchmark result files and flag regressions
+
+Usage:
+    python -m benchmarks.compare baseline.json current.json --threshold 0.10
+
+Exits with status 1 when any benchmark's median moved the wrong way by more
+than the threshold: up for lower-is-better results (latency, bytes, errors),
+down for higher-is-better ones (throughput). Any rise from a zero baseline of
+a lower-is-better result, such as errors or a heavy module getting imported,
+counts as a regression.
+"""
+import argparse
+import math
+import sys
+
+from .common import load_results, LOWER_IS_BETTER, HIGHER_IS_BETTER
+
+
+def direction(result: dict) -> str:
+    """Direction of a result; files written before results carried one fall back to the unit"""
+    if "direction" in result:
+        return result["direction"]
+    return HIGHER_IS_BETTER if result["unit"].endswith("/s") else LOWER_IS_BETTER
+
+
+def relative_change(before: float, after: float) -> float:
+    """Relative change of the median; infinite when it moves away from zero"""
+    if after == before:
+        return 0.0
+    if before == 0:
+        return math.inf if after > before else -math.inf
+    return (after - before) / abs(before)
+
+
+def is_regression(result: dict, change: float, threshold: float) -> bool:
+    if direction(result) == LOWER_IS_BETTER:
+        return change > threshold
+    if direction(result) == HIGHER_IS_BETTER:
+        return change < -threshold
+    return False
+
+
+def compare(baseline: dict, current: dict, threshold: float):
+    """Return (rows, regressions) comparing medians of benchmarks present in both runs"""
+    rows = []
+    regressions = []
+    base_benchmarks = baseline["benchmarks"]
+    for key, result in sorted(current["benchmarks"].items()):
+        if key not in base_benchmarks:
+            rows.append((key, None, result["median"], None, result["unit"]))
+            continue
+        before = base_benchmarks[key]["median"]
+        after = result["median"]
+        change = relative_change(before, after)
+        rows.append((key, before, after, change, result["unit"]))
+        if is_regression(result, change, threshold):
+            regressions.append(key)
+    return rows, regressions
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Compare two benchmark result files")
+    parser.add_argument("baseline")
+    parser.add_argument("current")
+    parser.add_argument("--threshold", type=float, default=0.10, help="Allowed relative change of the median in the worse direction")
+    args = parser.parse_args(argv)
+
+    rows, regressions = compare(load_results(args.baseline), load_results(args.current), args.threshold)
+    for key, before, after, change, unit in rows:
+        if before is None:
+            print(f"  {key:<80} {'new':>12} {after:>14,.3f} {unit}")
+            continue
+        marker = "!" if key in regressions else " "
+        print(f"{marker} {key:<80} {before:>14,.3f} -> {after:>14,.3f} {unit} ({change:+.1%})")
+
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) above {args.threshold:.0%}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,335 @@
+"""
+Multi-session load generator driving one `streamlit run app.py` server
+
+Every simulated user opens its own browser-style websocket session on the same
+Streamlit server and walks the real app: device-code login, a sample-question
+click in the sidebar and free-form follow-ups in the chat input, all against
+the offline stand-in server. The clients speak Streamlit's protobuf protocol
+directly, so no browser is needed.
+
+Because all sessions share one server process, the throughput and latency
+figures describe what a single replica sustains with N concurrent sessions,
+and memory per session is the growth of that server's RSS divided by N. The
+RSS baseline is taken after a warm-up session has gone through the whole
+journey, so it excludes the one-off cost of loading Streamlit, the app and
+the SDK. Result bytes per session come from the app's own /metrics endpoint.
+
+Usage:
+    python -m benchmarks.load_test --users 1,5,10,20 --follow-ups 3
+    python -m benchmarks.load_test --users 10 --latency genie=lognormal:2000,0.4 --output benchmarks/results/load.json
+"""
+import os
+import sys
+import time
+import socket
+import asyncio
+import argparse
+import logging
+import subprocess
+from typing import Dict, List, Optional, Any
+
+import requests
+
+from mock_server import MockServer, MockSettings, LatencyDistribution, LATENCY_GROUPS
+from modules.config import Config
+from .common import summarize, single_value, write_results, HIGHER_IS_BETTER
+
+APP_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app.py")
+
+FOLLOW_UPS = [
+    "Quais são as regiões com maior receita?",
+    "Mostre a evolução mensal de pedidos",
+    "Compare a receita deste ano com o ano passado",
+    "Quais produtos tiveram queda nas vendas?",
+]
+
+# Prefix of the ids Streamlit gives widgets; a keyed widget's id ends with "-<key>"
+WIDGET_ID_PREFIX = "$$ID-"
+
+
+def free_port() -> int:
+    """A TCP port that is free right now on the loopback interface"""
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def rss_bytes(pid: int) -> int:
+    """Resident set size of a process, from /proc"""
+    with open(f"/proc/{pid}/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+
+
+class StreamlitServer:
+    """`streamlit run app.py` in a child process that every simulated session connects to"""
+
+    def __init__(self, env: Dict[str, str], startup_timeout: float):
+        self.port = free_port()
+        self.metrics_port = free_port()
+        self.env = dict(env, METRICS_PORT=str(self.metrics_port))
+        self.startup_timeout = startup_timeout
+        self.process: Optional[subprocess.Popen] = None
+
+    @property
+    def stream_url(self) -> str:
+        return f"ws://127.0.0.1:{self.port}/_stcore/stream"
+
+    def start(self) -> "StreamlitServer":
+        self.process = subprocess.Popen(
+            [sys.executable, "-m", "streamlit", "run", APP_PATH,
+             "--server.headless", "true", "--server.port", str(self.port),
+             "--server.address", "127.0.0.1", "--browser.gatherUsageStats", "false"],
+            env=self.env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        )
+        deadline = time.monotonic() + self.startup_timeout
+        while time.monotonic() < deadline:
+            if self.process.poll() is not None:
+                raise RuntimeError(f"streamlit run exited with status {self.process.returncode}")
+            try:
+                if requests.get(f"http://127.0.0.1:{self.port}/_stcore/health", timeout=1).ok:
+                    return self
+            except requests.RequestException:
+                pass
+            time.sleep(0.2)
+        self.stop()
+        raise RuntimeError(f"streamlit run did not become healthy within {self.startup_timeout:g}s")
+
+    def stop(self):
+        if self.process is None or self.process.poll() is not None:
+            return
+        self.process.terminate()
+        try:
+            self.process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+            self.process.wait()
+
+    def __enter__(self) -> "StreamlitServer":
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def rss_bytes(self) -> int:
+        return rss_bytes(self.process.pid)
+
+    def scrape(self, metric: str) -> float:
+        """Current value of an unlabelled metric from the app's /metrics endpoint"""
+        text = requests.get(f"http://127.0.0.1:{self.metrics_port}/metrics", timeout=10).text
+        for line in text.splitlines():
+            name, _, value = line.partition(" ")
+            if name == metric:
+                return float(value)
+        return 0.0
+
+
+class SimulatedUser:
+    """One browser session walking through the app over Streamlit's websocket protocol"""
+
+    def __init__(self, user_index: int, follow_ups: int, timeout: float):
+        self.user_index = user_index
+        self.follow_ups = follow_ups
+        self.timeout = timeout
+        self.websocket = None
+        # Widget ids from the last script run, by key ("chat_input" for the unkeyed chat input)
+        self.widget_ids: Dict[str, str] = {}
+        self.timings: Dict[str, List[float]] = {}
+        self.errors: List[str] = []
+
+    async def connect(self, stream_url: str):
+        import websockets
+        self.websocket = await websockets.connect(stream_url, subprotocols=["streamlit"], max_size=None)
+
+    async def close(self):
+        if self.websocket is not None:
+            await self.websocket.close()
+
+    async def _rerun(self, widget_state=None, interaction: str = ""):
+        """Ask for a script run and read ForwardMsgs until it (and any st.rerun it triggers) finishes"""
+        from streamlit.proto.BackMsg_pb2 import BackMsg
+        from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+
+        back_msg = BackMsg()
+        back_msg.rerun_script.query_string = ""
+        back_msg.rerun_script.page_script_hash = ""
+        if widget_state is not None:
+            back_msg.rerun_script.widget_states.widgets.append(widget_state)
+        await self.websocket.send(back_msg.SerializeToString())
+
+        self.widget_ids = {}
+        while True:
+            forward_msg = ForwardMsg()
+            forward_msg.ParseFromString(await self.websocket.recv())
+            message_type = forward_msg.WhichOneof("type")
+            if message_type == "delta" and forward_msg.delta.WhichOneof("type") == "new_element":
+                self._read_element(forward_msg.delta.new_element, interaction)
+            elif message_type == "script_finished":
+                if forward_msg.script_finished != ForwardMsg.FINISHED_EARLY_FOR_RERUN:
+                    return
+                self.widget_ids = {}
+
+    def _read_element(self, element, interaction: str):
+        kind = element.WhichOneof("type")
+        if kind == "exception":
+            self.errors.append(f"{interaction}: {element.exception.message}")
+            return
+        widget_id = getattr(getattr(element, kind), "id", None)
+        if not isinstance(widget_id, str) or not widget_id.startswith(WIDGET_ID_PREFIX):
+            return
+        if kind == "chat_input":
+            self.widget_ids["chat_input"] = widget_id
+        else:
+            self.widget_ids[widget_id.split("-", 2)[2]] = widget_id
+
+    async def _timed(self, interaction: str, widget_state=None, record: bool = True):
+        start = time.perf_counter()
+        await asyncio.wait_for(self._rerun(widget_state, interaction), self.timeout)
+        if record:
+            self.timings.setdefault(interaction, []).append(time.perf_counter() - start)
+
+    async def _click(self, interaction: str, key: str, record: bool = True):
+        from streamlit.proto.WidgetStates_pb2 import WidgetState
+        if key not in self.widget_ids:
+            raise RuntimeError(f"no widget with key {key!r} on the page")
+        await self._timed(interaction, WidgetState(id=self.widget_ids[key], trigger_value=True), record)
+
+    async def _chat(self, text: str):
+        from streamlit.proto.WidgetStates_pb2 import WidgetState
+        if "chat_input" not in self.widget_ids:
+            raise RuntimeError("no chat input on the page")
+        widget_state = WidgetState(id=self.widget_ids["chat_input"])
+        widget_state.chat_input_value.data = text
+        await self._timed("follow_up", widget_state)
+
+    async def run(self):
+        """Walk the journey; any failure is recorded instead of raised"""
+        try:
+            await self._timed("first_paint")
+            login_start = time.perf_counter()
+            await self._click("login", "start_auth", record=False)
+            await self._click("login", "check_auth", record=False)
+            self.timings.setdefault("login", []).append(time.perf_counter() - login_start)
+
+            question = Config.SAMPLE_QUESTIONS[self.user_index % len(Config.SAMPLE_QUESTIONS)]
+            await self._click("sample_question", f"sample_{question}")
+
+            for turn in range(self.follow_ups):
+                await self._chat(FOLLOW_UPS[(self.user_index + turn) % len(FOLLOW_UPS)])
+        except asyncio.TimeoutError:
+            self.errors.append(f"timed out after {self.timeout:g}s")
+        except Exception as e:
+            self.errors.append(f"{type(e).__name__}: {e}")
+
+
+async def _run_sessions(server: StreamlitServer, users: int, follow_ups: int, timeout: float) -> Dict[str, Any]:
+    """Warm the server up with one session, then run `users` sessions at once and measure them"""
+    warm_up = SimulatedUser(0, 1, timeout)
+    await warm_up.connect(server.stream_url)
+    await warm_up.run()
+    await warm_up.close()
+    if warm_up.errors:
+        raise RuntimeError(f"warm-up session failed: {warm_up.errors[0]}")
+
+    rss_before = server.rss_bytes()
+    result_bytes_before = server.scrape("genie_session_result_bytes")
+    sessions = [SimulatedUser(i, follow_ups, timeout) for i in range(users)]
+    try:
+        await asyncio.gather(*(session.connect(server.stream_url) for session in sessions))
+        started = time.perf_counter()
+        await asyncio.gather(*(session.run() for session in sessions))
+        wall_time = time.perf_counter() - started
+        # Measured while every session is still connected and holding its state
+        rss_growth = max(0, server.rss_bytes() - rss_before)
+        result_bytes = max(0.0, server.scrape("genie_session_result_bytes") - result_bytes_before)
+    finally:
+        await asyncio.gather(*(session.close() for session in sessions), return_exceptions=True)
+
+    timings: Dict[str, List[float]] = {}
+    for session in sessions:
+        for interaction, samples in session.timings.items():
+            timings.setdefault(interaction, []).extend(samples)
+
+    questions = len(timings.get("sample_question", [])) + len(timings.get("follow_up", []))
+    return {
+        "users": users,
+        "wall_time": wall_time,
+        "questions": questions,
+        "interactions": sum(len(samples) for samples in timings.values()),
+        "timings": timings,
+        "errors": [error for session in sessions for error in session.errors],
+        "server_rss_per_session": rss_growth / users,
+        "result_bytes_per_session": result_bytes / users,
+    }
+
+
+def run_load(users: int, follow_ups: int, timeout: float) -> Dict[str, Any]:
+    """Start a fresh server and run `users` concurrent sessions against it"""
+    with StreamlitServer(dict(os.environ), startup_timeout=timeout) as server:
+        return asyncio.run(_run_sessions(server, users, follow_ups, timeout))
+
+
+def to_results(load: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    """Convert a load run into benchmark result entries"""
+    prefix = f"load[users={load['users']}]"
+    results = {
+        f"{prefix}.throughput_questions_per_s": single_value(round(load["questions"] / load["wall_time"], 3), "questions/s", HIGHER_IS_BETTER),
+        f"{prefix}.throughput_interactions_per_s": single_value(round(load["interactions"] / load["wall_time"], 3), "interactions/s", HIGHER_IS_BETTER),
+        f"{prefix}.server_rss_per_session": single_value(int(load["server_rss_per_session"]), "bytes"),
+        f"{prefix}.result_bytes_per_session": single_value(int(load["result_bytes_per_session"]), "bytes"),
+        f"{prefix}.errors": single_value(len(load["errors"]), "count"),
+    }
+    for interaction, samples in load["timings"].items():
+        results[f"{prefix}.{interaction}"] = summarize(samples)
+    return results
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Drive N concurrent sessions through one Streamlit server")
+    parser.add_argument("--users", default="1,5,10", help="Comma-separated concurrency levels to run in sequence")
+    parser.add_argument("--follow-ups", type=int, default=2, help="Free-form questions per user after the sample question")
+    parser.add_argument("--timeout", type=float, default=300, help="Seconds to wait for the server to start or for one script run")
+    parser.add_argument("--latency", action="append", default=[], metavar="GROUP=SPEC",
+                        help=f"Stand-in latency per endpoint group ({', '.join(LATENCY_GROUPS)})")
+    parser.add_argument("--rows", type=int, default=100, help="Rows returned by every query")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--throttle-rate", type=float, default=0.0)
+    parser.add_argument("--output", default="benchmarks/results/load.json")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.WARNING)
+
+    latency = {}
+    for item in args.latency:
+        group, _, spec = item.partition("=")
+        LatencyDistribution(spec)
+        latency[group] = spec
+    settings = MockSettings(rows=args.rows, latency=latency,
+                            error_rate=args.error_rate, throttle_rate=args.throttle_rate)
+
+    results = {}
+    with MockServer(settings) as server:
+        os.environ.update(server.env())
+        os.environ.setdefault("TRACE_EXPORTER", "none")
+        for users in [int(u) for u in args.users.split(",") if u.strip()]:
+            print(f"Running {users} concurrent session(s) on one server...", file=sys.stderr)
+            load = run_load(users, args.follow_ups, args.timeout)
+            results.update(to_results(load))
+
+            question_samples = sorted(load["timings"].get("sample_question", []) + load["timings"].get("follow_up", []))
+            summary = summarize(question_samples) if question_samples else {}
+            print(
+                f"users={users:<4} questions/s={load['questions'] / load['wall_time']:>8.2f} "
+                f"p50={summary.get('median', 0):>9.1f}ms p95={summary.get('p95', 0):>9.1f}ms "
+                f"p99={summary.get('p99', 0):>9.1f}ms rss/session={load['server_rss_per_session'] / 1024 / 1024:>7.2f}MiB "
+                f"errors={len(load['errors'])}"
+            )
+            for error in load["errors"][:5]:
+                print(f"  {error}", file=sys.stderr)
+
+    write_results(args.output, results)
+    print(f"Results written to {args.output}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
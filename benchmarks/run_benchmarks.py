@@ -0,0 +1,46 @@
+"""
+Run the benchmark suite and write the results as JSON
+
+Usage:
+    python -m benchmarks.run_benchmarks --output benchmarks/results/current.json
+    python -m benchmarks.run_benchmarks --only formatter --quick
+"""
+import argparse
+import logging
+import sys
+
+from . import bench_charting, bench_formatter, bench_import, bench_pipeline, bench_session_memory
+from .common import write_results
+
+SUITES = {
+    "charting": bench_charting,
+    "formatter": bench_formatter,
+    "import_time": bench_import,
+    "pipeline": bench_pipeline,
+    "session_memory": bench_session_memory,
+}
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Run the Genie AI Chatbot benchmarks")
+    parser.add_argument("--output", default="benchmarks/results/latest.json", help="Where to write the JSON results")
+    parser.add_argument("--only", action="append", choices=sorted(SUITES), help="Run only the given suite(s)")
+    parser.add_argument("--quick", action="store_true", help="Fewer repetitions and sizes, for smoke runs")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.WARNING)
+    results = {}
+    for name in args.only or SUITES:
+        print(f"Running {name} benchmarks...", file=sys.stderr)
+        results.update(SUITES[name].run(quick=args.quick))
+
+    for key, result in sorted(results.items()):
+        print(f"{key:<80} {result['median']:>14,.3f} {result['unit']}")
+
+    write_results(args.output, results)
+    print(f"Results written to {args.output}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,279 @@
+"""
+Genie AI Chatbot - Headless Batch Mode
+Runs a file of questions against a Genie space with bounded concurrency and
+streams the answers, formatted output and timings to JSONL or Parquet.
+
+Usage:
+    python cli.py questions.txt --output results.jsonl --concurrency 4
+    python cli.py questions.jsonl --output results.parquet --summary summary.json
+
+Authentication is non-interactive: set GENIE_TOKEN (or pass --token) with an
+existing access token, or set CLIENT_SECRET to use the client credentials grant
+of the app registration configured by TENANT_ID/CLIENT_ID.
+"""
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Any
+from dotenv import load_dotenv
+
+from modules.tracing import LatencyHistogram
+
+logger = logging.getLogger(__name__)
+
+# Output columns and their pyarrow types
+RESULT_FIELDS = [
+    ("index", "int64"),
+    ("question", "string"),
+    ("success", "bool_"),
+    ("response_type", "string"),
+    ("conversation_id", "string"),
+    ("started_at", "string"),
+    ("latency_ms", "float64"),
+    ("row_count", "int64"),
+    ("query_description", "string"),
+    ("error", "string"),
+    ("formatted", "string"),
+    ("response", "string"),
+]
+
+
+def load_questions(path: str) -> List[str]:
+    """Read questions from a text file (one per line, # for comments) or a JSONL file"""
+    questions = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            if path.endswith(".jsonl"):
+                questions.append(json.loads(line)["question"])
+            else:
+                questions.append(line)
+    return questions
+
+
+class JsonLinesResultWriter:
+    """Writes one JSON object per answered question, flushed as it arrives"""
+
+    def __init__(self, path: str):
+        self.file = sys.stdout if path == "-" else open(path, "w", encoding="utf-8")
+
+    def write(self, record: Dict[str, Any]):
+        self.file.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self.file.flush()
+
+    def close(self):
+        if self.file is not sys.stdout:
+            self.file.close()
+
+
+class ParquetResultWriter:
+    """Writes answered questions to Parquet in row groups of `batch_size` records"""
+
+    def __init__(self, path: str, batch_size: int = 100):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise RuntimeError("Parquet output requires pyarrow: pip install pyarrow")
+        self.pa = pa
+        self.schema = pa.schema([(name, getattr(pa, type_name)()) for name, type_name in RESULT_FIELDS])
+        self.writer = pq.ParquetWriter(path, self.schema)
+        self.batch_size = batch_size
+        self.pending: List[Dict[str, Any]] = []
+
+    def write(self, record: Dict[str, Any]):
+        self.pending.append(record)
+        if len(self.pending) >= self.batch_size:
+            self._flush()
+
+    def _flush(self):
+        if self.pending:
+            self.writer.write_table(self.pa.Table.from_pylist(self.pending, schema=self.schema))
+            self.pending = []
+
+    def close(self):
+        self._flush()
+        self.writer.close()
+
+
+def open_writer(path: str):
+    """Pick the writer from the output file extension"""
+    if path.endswith(".parquet"):
+        return ParquetResultWriter(path)
+    return JsonLinesResultWriter(path)
+
+
+def build_record(index: int, question: str, started_at: str, latency: float,
+                 answer_json: Dict[str, Any], conversation_id: Optional[str], formatted: str) -> Dict[str, Any]:
+    """Flatten one answer into an output record"""
+    error = answer_json.get("error")
+    if "columns" in answer_json and "data" in answer_json:
+        response_type = "table"
+        row_count = answer_json.get("total_row_count") or len(answer_json["data"].get("data_array") or [])
+        success = True
+    elif "answers" in answer_json:
+        # A merged fan-out answer succeeds if at least one space answered
+        response_type = "merged"
+        row_count = None
+        failed = [answer for answer in answer_json["answers"] if "error" in answer]
+        success = len(failed) < len(answer_json["answers"])
+        if not success:
+            error = "; ".join(f"{answer.get('space')}: {answer['error']}" for answer in failed) or "No space answered"
+    elif "error" in answer_json:
+        response_type = "error"
+        row_count = None
+        success = False
+    else:
+        response_type = "message"
+        row_count = None
+        success = True
+    return {
+        "index": index,
+        "question": question,
+        "success": success,
+        "response_type": response_type,
+        "conversation_id": conversation_id,
+        "started_at": started_at,
+        "latency_ms": round(latency * 1000, 3),
+        "row_count": row_count,
+        "query_description": answer_json.get("query_description"),
+        "error": error,
+        "formatted": formatted,
+        "response": json.dumps(answer_json, ensure_ascii=False),
+    }
+
+
+class BatchRunner:
+    """Runs questions through GenieService with bounded concurrency"""
+
+    def __init__(self, genie_service, concurrency: int = 4):
+        self.genie_service = genie_service
+        self.concurrency = concurrency
+        # A fan-out question makes one blocking SDK call per space at a time
+        self.workers = concurrency * max(1, len(getattr(genie_service.client, "spaces", None) or []))
+        self.histogram = LatencyHistogram("cli.question")
+        self.failures = 0
+
+    async def _ask(self, semaphore: asyncio.Semaphore, index: int, question: str, writer):
+        async with semaphore:
+            started_at = datetime.now(timezone.utc).isoformat()
+            start = time.perf_counter()
+            try:
+                response = await self.genie_service.ask_async(question)
+                latency = time.perf_counter() - start
+                record = build_record(index, question, started_at, latency, response["response"],
+                                      response["conversation_id"], response["formatted"])
+            except Exception as e:
+                # One failing question becomes an error record instead of aborting the batch
+                latency = time.perf_counter() - start
+                logger.error(f"[{index}] {type(e).__name__}: {e}")
+                record = build_record(index, question, started_at, latency,
+                                      {"error": f"{type(e).__name__}: {e}"}, None, "")
+
+        self.histogram.record(latency)
+        if not record["success"]:
+            self.failures += 1
+        writer.write(record)
+        logger.info(f"[{index}] {record['response_type']} in {record['latency_ms']:.0f} ms: {question}")
+
+    async def run_async(self, questions: List[str], writer) -> Dict[str, Any]:
+        loop = asyncio.get_running_loop()
+        loop.set_default_executor(ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="genie-cli"))
+        semaphore = asyncio.Semaphore(self.concurrency)
+        start = time.perf_counter()
+        await asyncio.gather(*(self._ask(semaphore, i, q, writer) for i, q in enumerate(questions)))
+        wall_time = time.perf_counter() - start
+        return {
+            "questions": len(questions),
+            "failures": self.failures,
+            "concurrency": self.concurrency,
+            "wall_time_s": round(wall_time, 3),
+            "throughput_per_s": round(len(questions) / wall_time, 3) if wall_time else None,
+            "latency": self.histogram.snapshot()
+        }
+
+    def run(self, questions: List[str], writer) -> Dict[str, Any]:
+        return asyncio.run(self.run_async(questions, writer))
+
+
+def acquire_token(args: argparse.Namespace) -> Optional[str]:
+    """Get a non-interactive token: explicit token first, then client credentials"""
+    token = args.token or os.getenv("GENIE_TOKEN")
+    if token:
+        return token
+
+    client_secret = os.getenv("CLIENT_SECRET")
+    if client_secret:
+        from modules.auth_client import AzureAuthClient
+        token_response = AzureAuthClient().acquire_client_credentials_token(client_secret)
+        if "access_token" in token_response:
+            return token_response["access_token"]
+        error = token_response.get("error_description", "Unknown error")
+        logger.error(f"Client credentials authentication failed: {error}")
+    return None
+
+
+def positive_int(value: str) -> int:
+    """argparse type for an integer of at least 1"""
+    try:
+        number = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected a positive integer, got '{value}'")
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"expected a positive integer, got {number}")
+    return number
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Run a file of questions against a Genie space")
+    parser.add_argument("questions", help="Text file (one question per line) or JSONL file with a 'question' field")
+    parser.add_argument("--output", "-o", default="-", help="Output file (.jsonl or .parquet); '-' for stdout")
+    parser.add_argument("--concurrency", "-c", type=positive_int, default=4, help="Questions in flight at once")
+    parser.add_argument("--token", help="Access token (defaults to GENIE_TOKEN)")
+    parser.add_argument("--summary", help="Write the run summary (throughput, latency percentiles) to this JSON file")
+    parser.add_argument("--verbose", "-v", action="store_true")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    """Batch entry point; exits non-zero if authentication fails or any question errors"""
+    load_dotenv()
+    args = parse_args(argv)
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.WARNING, stream=sys.stderr)
+
+    token = acquire_token(args)
+    if not token:
+        logger.error("No token available: set GENIE_TOKEN, pass --token, or set CLIENT_SECRET")
+        return 2
+
+    from modules.genie_service import GenieService
+
+    service = GenieService(token)
+    if not service.available:
+        logger.error(service.init_error)
+        return 2
+
+    questions = load_questions(args.questions)
+    writer = open_writer(args.output)
+    try:
+        summary = BatchRunner(service, args.concurrency).run(questions, writer)
+    finally:
+        writer.close()
+
+    if args.summary:
+        with open(args.summary, "w", encoding="utf-8") as f:
+            json.dump(summary, f, indent=2)
+    print(json.dumps(summary, indent=2), file=sys.stderr)
+    return 1 if summary["failures"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
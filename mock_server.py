@@ -0,0 +1,578 @@
+"""
+Genie AI Chatbot - Offline Stand-in Server
+A local mock of Azure AD, Microsoft Graph, the Databricks Genie API and the
+Statement Execution API for deterministic load and latency testing.
+
+Usage:
+    python mock_server.py --port 8765 --latency genie=lognormal:2000,0.4 --rows 50000
+
+Then point the app at it:
+    AZURE_AUTHORITY_HOST=http://127.0.0.1:8765
+    GRAPH_API_URL=http://127.0.0.1:8765/v1.0
+    DATABRICKS_HOST=http://127.0.0.1:8765
+"""
+import re
+import json
+import time
+import uuid
+import random
+import hashlib
+import argparse
+import logging
+import threading
+from datetime import datetime, timedelta, timezone
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+logger = logging.getLogger(__name__)
+
+# Endpoint groups that accept their own latency distribution
+LATENCY_GROUPS = [
+    "device_code", "token", "graph",
+    "genie",            # start-conversation / create-message (Genie planning + query execution)
+    "genie_get",        # get message / get query result
+    "statement",        # get statement
+    "chunk",            # fetch result chunk (internal link or external link)
+]
+
+DEFAULT_COLUMNS = [
+    ("event_time", "TIMESTAMP"),
+    ("region", "STRING"),
+    ("orders", "BIGINT"),
+    ("revenue", "DOUBLE"),
+]
+
+# SQL type names mapped to the type_name the Statement Execution API reports
+API_TYPE_NAMES = {"BIGINT": "LONG", "INTEGER": "INT", "SMALLINT": "SHORT", "TINYINT": "BYTE", "REAL": "FLOAT"}
+
+REGIONS = ["norte", "nordeste", "centro-oeste", "sudeste", "sul"]
+
+
+class LatencyDistribution:
+    """Latency sampler parsed from 'fixed:MS', 'uniform:LO,HI', 'normal:MEAN,STD' or 'lognormal:MEDIAN,SIGMA'"""
+
+    def __init__(self, spec: str = "fixed:0"):
+        self.spec = spec
+        kind, _, params = spec.partition(":")
+        self.kind = kind.strip().lower()
+        self.params = [float(p) for p in params.split(",") if p.strip()] if params else []
+        expected = {"fixed": 1, "uniform": 2, "normal": 2, "lognormal": 2}
+        if self.kind not in expected or len(self.params) != expected[self.kind]:
+            raise ValueError(f"Invalid latency spec: {spec}")
+
+    def sample(self, rng: random.Random) -> float:
+        """Return a latency in seconds"""
+        if self.kind == "fixed":
+            ms = self.params[0]
+        elif self.kind == "uniform":
+            ms = rng.uniform(*self.params)
+        elif self.kind == "normal":
+            ms = rng.gauss(*self.params)
+        else:
+            median, sigma = self.params
+            ms = rng.lognormvariate(0, sigma) * median
+        return max(0.0, ms) / 1000
+
+
+@dataclass
+class MockSettings:
+    """Behaviour of the stand-in server"""
+    seed: int = 42
+    latency: Dict[str, str] = field(default_factory=dict)
+    error_rate: float = 0.0
+    throttle_rate: float = 0.0
+    retry_after: int = 1
+    pending_polls: int = 0
+    polls_before_complete: int = 0
+    rows: int = 100
+    chunk_rows: int = 10000
+    columns: List[Tuple[str, str]] = field(default_factory=lambda: list(DEFAULT_COLUMNS))
+    disposition: str = "INLINE"
+    text_ratio: float = 0.0
+
+    def latency_for(self, group: str) -> LatencyDistribution:
+        return LatencyDistribution(self.latency.get(group, self.latency.get("default", "fixed:0")))
+
+
+class MockState:
+    """In-memory conversations, messages and statements"""
+
+    def __init__(self, settings: MockSettings):
+        self.settings = settings
+        self.rng = random.Random(settings.seed)
+        self.latencies = {group: settings.latency_for(group) for group in LATENCY_GROUPS}
+        self.lock = threading.Lock()
+        self.device_codes: Dict[str, int] = {}
+        self.messages: Dict[str, Dict] = {}
+        self.message_polls: Dict[str, int] = {}
+        self.statements: Dict[str, Dict] = {}
+        self.request_counts: Dict[str, int] = {}
+
+    def sample_latency(self, group: str) -> float:
+        with self.lock:
+            return self.latencies[group].sample(self.rng)
+
+    def roll(self) -> Optional[str]:
+        """Decide whether to inject a failure for this request"""
+        with self.lock:
+            value = self.rng.random()
+        if value < self.settings.throttle_rate:
+            return "throttle"
+        if value < self.settings.throttle_rate + self.settings.error_rate:
+            return "error"
+        return None
+
+    def count(self, route: str):
+        with self.lock:
+            self.request_counts[route] = self.request_counts.get(route, 0) + 1
+
+    def answers_with_text(self, question: str) -> bool:
+        digest = int(hashlib.sha1(question.encode("utf-8")).hexdigest()[:8], 16)
+        return digest / 0xFFFFFFFF < self.settings.text_ratio
+
+
+class MockDataGenerator:
+    """Deterministic rows generated on demand so large results cost no server memory"""
+
+    def __init__(self, settings: MockSettings):
+        self.settings = settings
+        self.base_time = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+    def value(self, row: int, type_name: str) -> Optional[str]:
+        seed = (row * 2654435761 + self.settings.seed) & 0xFFFFFFFF
+        if seed % 97 == 0:
+            return None
+        if type_name == "TIMESTAMP":
+            return (self.base_time + timedelta(minutes=row)).strftime("%Y-%m-%dT%H:%M:%S.000Z")
+        if type_name == "DATE":
+            return (self.base_time + timedelta(days=row)).strftime("%Y-%m-%d")
+        if type_name in ("INT", "INTEGER", "BIGINT", "LONG", "SHORT", "SMALLINT", "BYTE", "TINYINT"):
+            return str(seed % 10000)
+        if type_name in ("DECIMAL", "DOUBLE", "FLOAT", "REAL"):
+            return f"{(seed % 1000000) / 100:.2f}"
+        if type_name == "BOOLEAN":
+            return "true" if seed % 2 else "false"
+        return REGIONS[seed % len(REGIONS)]
+
+    def rows(self, offset: int, count: int) -> List[List[Optional[str]]]:
+        return [
+            [self.value(row, type_name) for _, type_name in self.settings.columns]
+            for row in range(offset, offset + count)
+        ]
+
+    def schema(self) -> Dict:
+        return {
+            "column_count": len(self.settings.columns),
+            "columns": [
+                {"name": name, "type_name": API_TYPE_NAMES.get(type_name, type_name), "type_text": type_name, "position": i}
+                for i, (name, type_name) in enumerate(self.settings.columns)
+            ]
+        }
+
+
+class MockRequestHandler(BaseHTTPRequestHandler):
+    """Routes requests to the Azure AD, Graph, Genie and Statement Execution stand-ins"""
+
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    state: MockState = None
+    data: MockDataGenerator = None
+
+    ROUTES = [
+        ("GET", r"^/\.well-known/databricks-config$", None, "_host_metadata"),
+        ("POST", r"^/(?P<tenant>[^/]+)/oauth2/v2\.0/devicecode$", "device_code", "_device_code"),
+        ("POST", r"^/(?P<tenant>[^/]+)/oauth2/v2\.0/token$", "token", "_token"),
+        ("GET", r"^/v1\.0/me$", "graph", "_me"),
+        ("POST", r"^/api/2\.0/genie/spaces/(?P<space_id>[^/]+)/start-conversation$", "genie", "_start_conversation"),
+        ("POST", r"^/api/2\.0/genie/spaces/(?P<space_id>[^/]+)/conversations/(?P<conversation_id>[^/]+)/messages$", "genie", "_create_message"),
+        ("GET", r"^/api/2\.0/genie/spaces/(?P<space_id>[^/]+)/conversations/(?P<conversation_id>[^/]+)/messages/(?P<message_id>[^/]+)$", "genie_get", "_get_message"),
+        ("GET", r"^/api/2\.0/genie/spaces/(?P<space_id>[^/]+)/conversations/(?P<conversation_id>[^/]+)/messages/(?P<message_id>[^/]+)/query-result$", "genie_get", "_get_query_result"),
+        ("GET", r"^/api/2\.0/genie/spaces/(?P<space_id>[^/]+)/conversations/(?P<conversation_id>[^/]+)/messages/(?P<message_id>[^/]+)/attachments/(?P<attachment_id>[^/]+)/query-result$", "genie_get", "_get_query_result"),
+        ("GET", r"^/api/2\.0/sql/statements/(?P<statement_id>[^/]+)$", "statement", "_get_statement"),
+        ("GET", r"^/api/2\.0/sql/statements/(?P<statement_id>[^/]+)/result/chunks/(?P<chunk_index>\d+)$", "chunk", "_get_chunk"),
+        ("GET", r"^/external/(?P<statement_id>[^/]+)/(?P<chunk_index>\d+)$", "chunk", "_get_external_chunk"),
+    ]
+
+    def log_message(self, format, *args):
+        logger.debug(format % args)
+
+    def do_GET(self):
+        self._dispatch("GET")
+
+    def do_POST(self):
+        self._dispatch("POST")
+
+    def _dispatch(self, method: str):
+        path = urlparse(self.path).path
+        length = int(self.headers.get("Content-Length") or 0)
+        raw_body = self.rfile.read(length) if length else b""
+
+        for route_method, pattern, group, handler_name in self.ROUTES:
+            match = re.match(pattern, path)
+            if route_method != method or not match:
+                continue
+
+            self.state.count(handler_name.lstrip("_"))
+            failure = None
+            if group is not None:
+                time.sleep(self.state.sample_latency(group))
+                failure = self.state.roll()
+
+            if failure == "throttle":
+                self._send_json(429, {"error_code": "TOO_MANY_REQUESTS", "message": "Injected throttle"},
+                                {"Retry-After": str(self.state.settings.retry_after)})
+                return
+            if failure == "error":
+                self._send_json(500, {"error_code": "INTERNAL_ERROR", "message": "Injected failure"})
+                return
+
+            try:
+                status, body = getattr(self, handler_name)(raw_body, **match.groupdict())
+            except KeyError as e:
+                status, body = 404, {"error_code": "RESOURCE_DOES_NOT_EXIST", "message": f"Unknown id {e}"}
+            self._send_json(status, body)
+            return
+
+        self._send_json(404, {"error_code": "ENDPOINT_NOT_FOUND", "message": f"No mock for {method} {path}"})
+
+    def _send_json(self, status: int, body, extra_headers: Optional[Dict[str, str]] = None):
+        payload = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        for key, value in (extra_headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    @staticmethod
+    def _form(raw_body: bytes) -> Dict[str, str]:
+        return {key: values[0] for key, values in parse_qs(raw_body.decode("utf-8")).items()}
+
+    @staticmethod
+    def _json(raw_body: bytes) -> Dict:
+        return json.loads(raw_body.decode("utf-8")) if raw_body else {}
+
+    # Databricks host discovery
+
+    def _host_metadata(self, raw_body: bytes):
+        return 200, {"oidc_endpoint": f"http://{self.headers.get('Host')}/oidc", "workspace_id": "1234567890"}
+
+    # Azure AD
+
+    def _device_code(self, raw_body: bytes, tenant: str):
+        device_code = uuid.uuid4().hex
+        with self.state.lock:
+            self.state.device_codes[device_code] = 0
+        return 200, {
+            "device_code": device_code,
+            "user_code": device_code[:9].upper(),
+            "verification_uri": "https://microsoft.com/devicelogin",
+            "expires_in": 900,
+            "interval": 5,
+            "message": "Mock device code flow"
+        }
+
+    def _token(self, raw_body: bytes, tenant: str):
+        form = self._form(raw_body)
+        if form.get("grant_type") == "urn:ietf:params:oauth:grant-type:device_code":
+            device_code = form.get("device_code")
+            with self.state.lock:
+                if device_code not in self.state.device_codes:
+                    return 400, {"error": "bad_verification_code", "error_description": "Unknown device code"}
+                polls = self.state.device_codes[device_code]
+                self.state.device_codes[device_code] = polls + 1
+            if polls < self.state.settings.pending_polls:
+                return 400, {"error": "authorization_pending", "error_description": "User has not signed in yet"}
+        return 200, {
+            "token_type": "Bearer",
+            "scope": form.get("scope", ""),
+            "expires_in": 3600,
+            "access_token": f"mock-{uuid.uuid4().hex}",
+            "refresh_token": f"mock-refresh-{uuid.uuid4().hex}"
+        }
+
+    # Microsoft Graph
+
+    def _me(self, raw_body: bytes):
+        return 200, {
+            "displayName": "Mock User",
+            "mail": "mock.user@example.com",
+            "userPrincipalName": "mock.user@example.com"
+        }
+
+    # Genie
+
+    def _new_message(self, space_id: str, conversation_id: str, content: str) -> Dict:
+        message_id = uuid.uuid4().hex
+        now = int(time.time() * 1000)
+        message = {
+            "id": message_id,
+            "message_id": message_id,
+            "space_id": space_id,
+            "conversation_id": conversation_id,
+            "content": content,
+            "status": "COMPLETED",
+            "created_timestamp": now,
+            "last_updated_timestamp": now,
+            "attachments": []
+        }
+
+        if self.state.answers_with_text(content):
+            message["attachments"].append({
+                "attachment_id": uuid.uuid4().hex,
+                "text": {"content": f"Resposta simulada para: {content}"}
+            })
+        else:
+            statement_id = uuid.uuid4().hex
+            with self.state.lock:
+                self.state.statements[statement_id] = {"created": now}
+            message["attachments"].append({
+                "attachment_id": uuid.uuid4().hex,
+                "query": {
+                    "query": "SELECT * FROM mock.sales.orders",
+                    "description": f"Consulta simulada para: {content}",
+                    "statement_id": statement_id
+                }
+            })
+            message["query_result"] = {"statement_id": statement_id, "row_count": self.state.settings.rows}
+
+        with self.state.lock:
+            self.state.messages[message_id] = message
+            self.state.message_polls[message_id] = 0
+        return message
+
+    def _start_conversation(self, raw_body: bytes, space_id: str):
+        conversation_id = uuid.uuid4().hex
+        message = self._new_message(space_id, conversation_id, self._json(raw_body).get("content", ""))
+        return 200, {
+            "conversation_id": conversation_id,
+            "message_id": message["id"],
+            "conversation": {"id": conversation_id, "space_id": space_id},
+            "message": dict(message, status="SUBMITTED")
+        }
+
+    def _create_message(self, raw_body: bytes, space_id: str, conversation_id: str):
+        message = self._new_message(space_id, conversation_id, self._json(raw_body).get("content", ""))
+        return 200, dict(message, status="SUBMITTED")
+
+    def _get_message(self, raw_body: bytes, space_id: str, conversation_id: str, message_id: str):
+        with self.state.lock:
+            message = self.state.messages[message_id]
+            polls = self.state.message_polls[message_id]
+            self.state.message_polls[message_id] = polls + 1
+        if polls < self.state.settings.polls_before_complete:
+            return 200, dict(message, status="EXECUTING_QUERY")
+        return 200, message
+
+    def _get_query_result(self, raw_body: bytes, space_id: str, conversation_id: str, message_id: str,
+                          attachment_id: Optional[str] = None):
+        with self.state.lock:
+            message = self.state.messages[message_id]
+        if "query_result" not in message:
+            return 400, {"error_code": "INVALID_PARAMETER_VALUE", "message": "Message has no query result"}
+        return 200, {"statement_response": self._statement(message["query_result"]["statement_id"])}
+
+    # Statement Execution
+
+    def _chunk_bounds(self) -> List[Tuple[int, int]]:
+        settings = self.state.settings
+        chunk_rows = max(1, settings.chunk_rows)
+        return [
+            (offset, min(chunk_rows, settings.rows - offset))
+            for offset in range(0, settings.rows, chunk_rows)
+        ] or [(0, 0)]
+
+    def _chunk(self, statement_id: str, chunk_index: int) -> Dict:
+        bounds = self._chunk_bounds()
+        offset, count = bounds[chunk_index]
+        chunk = {"chunk_index": chunk_index, "row_offset": offset, "row_count": count}
+        has_next = chunk_index + 1 < len(bounds)
+        if self.state.settings.disposition == "EXTERNAL_LINKS":
+            link = {
+                "chunk_index": chunk_index,
+                "row_offset": offset,
+                "row_count": count,
+                "external_link": f"http://{self.headers.get('Host')}/external/{statement_id}/{chunk_index}",
+                "expiration": (datetime.now(timezone.utc) + timedelta(minutes=15)).isoformat()
+            }
+            if has_next:
+                link["next_chunk_index"] = chunk_index + 1
+                link["next_chunk_internal_link"] = f"/api/2.0/sql/statements/{statement_id}/result/chunks/{chunk_index + 1}"
+            chunk["external_links"] = [link]
+        else:
+            chunk["data_array"] = self.data.rows(offset, count)
+        if has_next:
+            chunk["next_chunk_index"] = chunk_index + 1
+            chunk["next_chunk_internal_link"] = f"/api/2.0/sql/statements/{statement_id}/result/chunks/{chunk_index + 1}"
+        return chunk
+
+    def _statement(self, statement_id: str) -> Dict:
+        with self.state.lock:
+            if statement_id not in self.state.statements:
+                raise KeyError(statement_id)
+        bounds = self._chunk_bounds()
+        return {
+            "statement_id": statement_id,
+            "status": {"state": "SUCCEEDED"},
+            "manifest": {
+                "format": "JSON_ARRAY",
+                "schema": self.data.schema(),
+                "total_chunk_count": len(bounds),
+                "total_row_count": self.state.settings.rows,
+                "chunks": [
+                    {"chunk_index": i, "row_offset": offset, "row_count": count}
+                    for i, (offset, count) in enumerate(bounds)
+                ],
+                "truncated": False
+            },
+            "result": self._chunk(statement_id, 0)
+        }
+
+    def _get_statement(self, raw_body: bytes, statement_id: str):
+        return 200, self._statement(statement_id)
+
+    def _get_chunk(self, raw_body: bytes, statement_id: str, chunk_index: str):
+        self._statement_exists(statement_id)
+        return 200, self._chunk(statement_id, int(chunk_index))
+
+    def _get_external_chunk(self, raw_body: bytes, statement_id: str, chunk_index: str):
+        self._statement_exists(statement_id)
+        offset, count = self._chunk_bounds()[int(chunk_index)]
+        return 200, self.data.rows(offset, count)
+
+    def _statement_exists(self, statement_id: str):
+        with self.state.lock:
+            if statement_id not in self.state.statements:
+                raise KeyError(statement_id)
+
+
+class MockServer:
+    """Runs the stand-in server in a background thread"""
+
+    def __init__(self, settings: Optional[MockSettings] = None, host: str = "127.0.0.1", port: int = 0):
+        self.settings = settings or MockSettings()
+        self.state = MockState(self.settings)
+        handler = type("BoundMockRequestHandler", (MockRequestHandler,), {
+            "state": self.state,
+            "data": MockDataGenerator(self.settings)
+        })
+        self.httpd = ThreadingHTTPServer((host, port), handler)
+        self.httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def env(self) -> Dict[str, str]:
+        """Environment variables that point the app at this server"""
+        return {
+            "AZURE_AUTHORITY_HOST": self.url,
+            "GRAPH_API_URL": f"{self.url}/v1.0",
+            "DATABRICKS_HOST": self.url,
+            "TENANT_ID": "mock-tenant",
+            "CLIENT_ID": "mock-client",
+            "GENIE_SPACE_ID": "mock-space"
+        }
+
+    @property
+    def request_counts(self) -> Dict[str, int]:
+        with self.state.lock:
+            return dict(self.state.request_counts)
+
+    def start(self) -> "MockServer":
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name="mock-server", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self) -> "MockServer":
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def parse_columns(spec: str) -> List[Tuple[str, str]]:
+    """Parse 'name:TYPE,name:TYPE' into a column list"""
+    columns = []
+    for item in spec.split(","):
+        name, _, type_name = item.partition(":")
+        columns.append((name.strip(), (type_name or "STRING").strip().upper()))
+    return columns
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Offline stand-in for Azure AD, Graph and Databricks Genie")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--latency", action="append", default=[], metavar="GROUP=SPEC",
+                        help=f"Latency per endpoint group ({', '.join(LATENCY_GROUPS)} or default), "
+                             "e.g. genie=lognormal:2000,0.4 or statement=uniform:50,150")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered with HTTP 500")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="Fraction of requests answered with HTTP 429")
+    parser.add_argument("--retry-after", type=int, default=1, help="Retry-After seconds sent with 429 responses")
+    parser.add_argument("--pending-polls", type=int, default=0,
+                        help="Token polls answered with authorization_pending before the token is issued")
+    parser.add_argument("--polls-before-complete", type=int, default=0,
+                        help="Message polls answered with EXECUTING_QUERY before COMPLETED")
+    parser.add_argument("--rows", type=int, default=100, help="Rows returned by every query")
+    parser.add_argument("--chunk-rows", type=int, default=10000, help="Rows per result chunk")
+    parser.add_argument("--columns", default=None, help="Result schema, e.g. ts:TIMESTAMP,region:STRING,total:DOUBLE")
+    parser.add_argument("--disposition", choices=["INLINE", "EXTERNAL_LINKS"], default="INLINE")
+    parser.add_argument("--text-ratio", type=float, default=0.0,
+                        help="Fraction of questions answered with text instead of a query")
+    return parser.parse_args(argv)
+
+
+def settings_from_args(args: argparse.Namespace) -> MockSettings:
+    latency = {}
+    for item in args.latency:
+        group, _, spec = item.partition("=")
+        if group != "default" and group not in LATENCY_GROUPS:
+            raise ValueError(f"Unknown latency group: {group}")
+        LatencyDistribution(spec)
+        latency[group] = spec
+    return MockSettings(
+        seed=args.seed,
+        latency=latency,
+        error_rate=args.error_rate,
+        throttle_rate=args.throttle_rate,
+        retry_after=args.retry_after,
+        pending_polls=args.pending_polls,
+        polls_before_complete=args.polls_before_complete,
+        rows=args.rows,
+        chunk_rows=args.chunk_rows,
+        columns=parse_columns(args.columns) if args.columns else list(DEFAULT_COLUMNS),
+        disposition=args.disposition,
+        text_ratio=args.text_ratio
+    )
+
+
+def main(argv=None):
+    """Run the stand-in server until interrupted"""
+    logging.basicConfig(level=logging.INFO)
+    args = parse_args(argv)
+    server = MockServer(settings_from_args(args), host=args.host, port=args.port)
+    print(f"Mock server listening on {server.url}")
+    print("Point the app at it with:")
+    for key, value in server.env().items():
+        print(f"  {key}={value}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+
+
+if __name__ == "__main__":
+    main()
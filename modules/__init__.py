@@ -2,25 +2,43 @@
 Genie AI Chatbot - Modular Components
 
 This package contains the modular components for the Genie AI Chatbot:
-- auth_handler: Azure OAuth2 authentication
+- auth_client: Azure AD device code and Graph calls (no Streamlit)
+- auth_handler: Azure OAuth2 authentication flow for the Streamlit UI
 - genie_client: Databricks Genie API integration
+- genie_fanout: Concurrent questions to several Genie spaces
+- genie_service: Genie client plus formatter behind one interface (no Streamlit)
 - response_formatter: Data formatting utilities
 - ui_components: User interface components
 - config: Configuration management
+
+Classes are imported on first access, so importing one submodule (for example
+from the CLI) does not pull in Streamlit or the Databricks SDK.
 """
+import importlib
 
-from .auth_handler import AzureAuthHandler
-from .genie_client import GenieClient
-from .response_formatter import ResponseFormatter
-from .ui_components import UIComponents
-from .config import Config
+_LAZY_IMPORTS = {
+    'AzureAuthClient': '.auth_client',
+    'AzureAuthHandler': '.auth_handler',
+    'GenieClient': '.genie_client',
+    'GenieFanout': '.genie_fanout',
+    'GenieService': '.genie_service',
+    'ResponseFormatter': '.response_formatter',
+    'UIComponents': '.ui_components',
+    'Config': '.config',
+}
 
-__all__ = [
-    'AzureAuthHandler',
-    'GenieClient', 
-    'ResponseFormatter',
-    'UIComponents',
-    'Config'
-]
+__all__ = list(_LAZY_IMPORTS)
 
 __version__ = "1.0.0"
+
+
+def __getattr__(name):
+    if name in _LAZY_IMPORTS:
+        value = getattr(importlib.import_module(_LAZY_IMPORTS[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
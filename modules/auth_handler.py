@@ -1,88 +1,25 @@
 """
 Authentication handler for Azure OAuth2 device code flow
 """
-import os
 import time
-import requests
 import streamlit as st
 from typing import Dict, Optional
+from .auth_client import AzureAuthClient
+from .tracing import traced
 
 
-class AzureAuthHandler:
+class AzureAuthHandler(AzureAuthClient):
     """Handles Azure OAuth2 device code flow authentication"""
     
-    def __init__(self):
-        self.tenant_id = os.getenv("TENANT_ID")
-        self.client_id = os.getenv("CLIENT_ID")
-        self.scope = os.getenv("SCOPE", "2ff814a6-3304-4ab8-85cb-cd0e6f879c1d/.default https://graph.microsoft.com/User.Read")
-    
-    def get_user_info(self, access_token: str) -> Dict:
-        """Get user information from Microsoft Graph API"""
-        try:
-            headers = {
-                'Authorization': f'Bearer {access_token}',
-                'Content-Type': 'application/json'
-            }
-            response = requests.get('https://graph.microsoft.com/v1.0/me', headers=headers)
-            if response.status_code == 200:
-                user_data = response.json()
-                return {
-                    'name': user_data.get('displayName', 'User'),
-                    'email': user_data.get('mail') or user_data.get('userPrincipalName', 'user@example.com'),
-                    'success': True
-                }
-            else:
-                # If Graph API fails, return default user info
-                return {
-                    'name': 'Authenticated User',
-                    'email': 'user@authenticated.com',
-                    'success': True
-                }
-        except Exception as e:
-            # If Graph API fails, return default user info
-            return {
-                'name': 'Authenticated User', 
-                'email': 'user@authenticated.com',
-                'success': True
-            }
-    
     def start_device_code_flow(self) -> Optional[Dict]:
         """Start the device code flow and get the device code"""
-        try:
-            device_code_url = f"https://login.microsoftonline.com/{self.tenant_id}/oauth2/v2.0/devicecode"
-            device_code_data = {
-                'client_id': self.client_id,
-                'scope': self.scope
-            }
-            
-            response = requests.post(device_code_url, data=device_code_data)
-            device_code_response = response.json()
-            
-            if 'error' in device_code_response:
-                st.error(f"❌ Error: {device_code_response.get('error_description', 'Unknown error')}")
-                return None
-            
-            return device_code_response
-        except Exception as e:
-            st.error(f"❌ Error starting authentication: {str(e)}")
-            return None
-    
-    def check_device_code_status(self, device_code: str) -> Optional[Dict]:
-        """Check the status of device code authentication"""
-        try:
-            token_url = f"https://login.microsoftonline.com/{self.tenant_id}/oauth2/v2.0/token"
-            token_data = {
-                'grant_type': 'urn:ietf:params:oauth:grant-type:device_code',
-                'client_id': self.client_id,
-                'device_code': device_code
-            }
-            
-            response = requests.post(token_url, data=token_data)
-            return response.json()
-        except Exception as e:
-            st.error(f"❌ Error checking authentication: {str(e)}")
+        device_code_response = super().start_device_code_flow()
+        if 'error' in device_code_response:
+            st.error(f"❌ Error: {device_code_response.get('error_description', 'Unknown error')}")
             return None
+        return device_code_response
     
+    @traced("auth.handle_oauth_flow")
     def handle_oauth_flow(self) -> bool:
         """Handle the complete OAuth authentication flow in the UI"""
         st.markdown('<div class="login-container">', unsafe_allow_html=True)
@@ -0,0 +1,178 @@
+"""
+Chart detection and downsampling for numeric and time-series results
+"""
+from typing import Dict, Iterable, List, Optional, Any
+
+import numpy as np
+
+from .tracing import traced
+
+TIME_TYPES = ("TIMESTAMP", "TIMESTAMP_NTZ", "DATE")
+NUMERIC_TYPES = ("BYTE", "SHORT", "INT", "LONG", "FLOAT", "DOUBLE", "DECIMAL")
+
+
+def detect_chart_columns(columns: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """Pick the x axis and numeric series of a result from its manifest schema
+
+    A time column is preferred for the x axis; without one, the first numeric
+    column is used and the remaining numeric columns become the series.
+    Returns None when the result has nothing worth plotting.
+    """
+    time_columns = [i for i, column in enumerate(columns) if column.get("type_name") in TIME_TYPES]
+    numeric_columns = [i for i, column in enumerate(columns) if column.get("type_name") in NUMERIC_TYPES]
+
+    if time_columns and numeric_columns:
+        x_index, x_type, series = time_columns[0], "time", numeric_columns
+    elif len(numeric_columns) >= 2:
+        x_index, x_type, series = numeric_columns[0], "numeric", numeric_columns[1:]
+    else:
+        return None
+
+    return {
+        "x": {"index": x_index, "name": columns[x_index]["name"]},
+        "x_type": x_type,
+        "series": [{"index": i, "name": columns[i]["name"]} for i in series],
+    }
+
+
+def lttb(x: np.ndarray, y: np.ndarray, threshold: int) -> np.ndarray:
+    """Largest-Triangle-Three-Buckets: indices of `threshold` points that keep the shape of y(x)
+
+    The walk over buckets is sequential by definition, but each bucket's
+    triangle areas are computed in one vectorized step.
+    """
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    previous = 0
+    for bucket in range(threshold - 2):
+        start, end = edges[bucket], edges[bucket + 1]
+        next_start, next_end = end, edges[bucket + 2] if bucket + 2 < len(edges) else n
+        next_x = x[next_start:next_end].mean()
+        next_y = y[next_start:next_end].mean()
+        areas = np.abs(
+            (x[previous] - next_x) * (y[start:end] - y[previous])
+            - (x[previous] - x[start:end]) * (next_y - y[previous])
+        )
+        previous = start + int(np.argmax(areas))
+        selected[bucket + 1] = previous
+    return selected
+
+
+def min_max_downsample(ys: np.ndarray, buckets: int) -> np.ndarray:
+    """Indices of the minimum and maximum of every series in each of `buckets` equal-count buckets
+
+    `ys` has one row per series. Taking the union across series keeps every
+    series' peaks on a shared x axis. Fully vectorized: each argmin/argmax
+    per bucket comes from a single lexsort keyed by bucket.
+    """
+    n = ys.shape[1]
+    if buckets * 2 >= n:
+        return np.arange(n)
+
+    bucket_of = (np.arange(n) * buckets) // n
+    last_in_bucket = np.r_[np.flatnonzero(np.diff(bucket_of)), n - 1]
+    first_in_bucket = np.r_[0, last_in_bucket[:-1] + 1]
+
+    selected = [np.array([0, n - 1])]
+    for y in ys:
+        # NaN sorts last, so push missing values away from whichever end is taken
+        order_low = np.lexsort((np.where(np.isnan(y), np.inf, y), bucket_of))
+        order_high = np.lexsort((np.where(np.isnan(y), -np.inf, y), bucket_of))
+        selected.append(order_low[first_in_bucket])
+        selected.append(order_high[last_in_bucket])
+    return np.unique(np.concatenate(selected))
+
+
+@traced("chart.build")
+def build_chart(spec: Dict[str, Any], row_blocks: Iterable[List[List[Any]]], max_points: int,
+                max_rows: Optional[int] = None) -> Optional[Dict[str, Any]]:
+    """Collect the chart columns from row blocks and downsample them to at most ~max_points points
+
+    Only the x and series columns are kept, as float arrays, so memory grows
+    with rows * series rather than with the full result. A single series is
+    reduced with LTTB; several series share min/max buckets. The chart keeps
+    the downsampled points as float64 arrays, which is how it is held in the
+    session (see chart_nbytes).
+    """
+    import pandas as pd
+
+    x_index = spec["x"]["index"]
+    series_indexes = [s["index"] for s in spec["series"]]
+    x_parts: List[np.ndarray] = []
+    y_parts: List[np.ndarray] = []
+    row_count = 0
+
+    for rows in row_blocks:
+        if max_rows is not None and row_count + len(rows) > max_rows:
+            rows = rows[:max_rows - row_count]
+        if not rows:
+            break
+        row_count += len(rows)
+        raw_x = pd.Series([row[x_index] for row in rows])
+        if spec["x_type"] == "time":
+            times = pd.to_datetime(raw_x, utc=True, errors="coerce", format="ISO8601")
+            x_parts.append(np.where(times.isna(), np.nan, times.dt.tz_localize(None).to_numpy("datetime64[ms]").astype("int64")))
+        else:
+            x_parts.append(pd.to_numeric(raw_x, errors="coerce").to_numpy("float64"))
+        y_parts.append(np.vstack([
+            pd.to_numeric(pd.Series([row[i] for row in rows]), errors="coerce").to_numpy("float64")
+            for i in series_indexes
+        ]))
+        if max_rows is not None and row_count >= max_rows:
+            break
+
+    if not row_count:
+        return None
+
+    x = np.concatenate(x_parts)
+    ys = np.hstack(y_parts)
+    keep = ~np.isnan(x) & ~np.isnan(ys).all(axis=0)
+    x, ys = x[keep], ys[:, keep]
+    if len(x) < 2:
+        return None
+    order = np.argsort(x, kind="stable")
+    x, ys = x[order], ys[:, order]
+
+    if len(series_indexes) == 1:
+        y = ys[0]
+        valid = ~np.isnan(y)
+        indexes = np.flatnonzero(valid)[lttb(x[valid], y[valid], max_points)]
+        method = "lttb"
+    else:
+        indexes = min_max_downsample(ys, max(1, max_points // (2 * len(series_indexes))))
+        method = "min_max"
+
+    return {
+        "kind": "line",
+        "x_name": spec["x"]["name"],
+        "x_type": spec["x_type"],
+        "x": x[indexes],
+        "series": {s["name"]: ys[i, indexes] for i, s in enumerate(spec["series"])},
+        "source_rows": row_count,
+        "method": method if len(indexes) < len(x) else "none",
+    }
+
+
+def pending_chart(spec: Dict[str, Any], total_rows: int) -> Dict[str, Any]:
+    """Chart with no points yet, for a result whose rows all sit in later chunks or external links"""
+    return {
+        "kind": "line",
+        "x_name": spec["x"]["name"],
+        "x_type": spec["x_type"],
+        "x": np.empty(0),
+        "series": {s["name"]: np.empty(0) for s in spec["series"]},
+        "source_rows": 0,
+        "total_rows": total_rows,
+        "full": False,
+        "method": "none",
+    }
+
+
+def chart_nbytes(chart: Dict[str, Any]) -> int:
+    """Bytes held by a chart's point arrays"""
+    return chart["x"].nbytes + sum(values.nbytes for values in chart["series"].values())
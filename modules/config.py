@@ -2,7 +2,7 @@
 Configuration settings for the Genie AI Chatbot
 """
 import os
-from typing import Dict, Any
+from typing import Dict, List, Any
 
 
 class Config:
@@ -12,6 +12,8 @@ class Config:
     TENANT_ID = os.getenv("TENANT_ID")
     CLIENT_ID = os.getenv("CLIENT_ID")
     SCOPE = os.getenv("SCOPE", "2ff814a6-3304-4ab8-85cb-cd0e6f879c1d/.default")
+    AZURE_AUTHORITY_HOST = os.getenv("AZURE_AUTHORITY_HOST", "https://login.microsoftonline.com")
+    GRAPH_API_URL = os.getenv("GRAPH_API_URL", "https://graph.microsoft.com/v1.0")
     
     # Databricks settings
     DATABRICKS_HOST = os.getenv("DATABRICKS_HOST")
@@ -46,9 +48,91 @@ class Config:
             if not getattr(cls, var):
                 missing_vars.append(var)
         
+        # GENIE_SPACES replaces the single GENIE_SPACE_ID
+        if 'GENIE_SPACE_ID' in missing_vars and cls.get_genie_spaces():
+            missing_vars.remove('GENIE_SPACE_ID')
+        
+        invalid_settings = cls.get_genie_space_errors()
+        return {
+            'valid': len(missing_vars) == 0 and len(invalid_settings) == 0,
+            'missing_vars': missing_vars,
+            'invalid_settings': invalid_settings
+        }
+    
+    @classmethod
+    def is_admin(cls, email: str) -> bool:
+        """Check whether a user may open the admin panel"""
+        admin_emails = [e.strip().lower() for e in os.getenv("ADMIN_EMAILS", "").split(",") if e.strip()]
+        return bool(email) and email.lower() in admin_emails
+    
+    @classmethod
+    def get_genie_spaces(cls) -> List[Dict[str, Any]]:
+        """Genie spaces to query, from GENIE_SPACES or the single GENIE_SPACE_ID
+        
+        GENIE_SPACES is a comma-separated list of name=space_id entries, each
+        optionally followed by :keyword|keyword used to route questions,
+        e.g. "vendas=01ef...:receita|pedidos,financeiro=01f0...".
+        Malformed entries are left out here and reported by get_genie_space_errors.
+        """
+        spaces = []
+        for entry in os.getenv("GENIE_SPACES", "").split(","):
+            if not entry.strip() or "=" not in entry:
+                continue
+            name, _, rest = entry.partition("=")
+            space_id, _, keywords = rest.partition(":")
+            if not name.strip() or not space_id.strip():
+                continue
+            spaces.append({
+                'name': name.strip(),
+                'space_id': space_id.strip(),
+                'keywords': [k.strip().lower() for k in keywords.split("|") if k.strip()]
+            })
+        if not spaces and os.getenv("GENIE_SPACE_ID"):
+            spaces.append({'name': 'default', 'space_id': os.getenv("GENIE_SPACE_ID"), 'keywords': []})
+        return spaces
+    
+    @classmethod
+    def get_genie_space_errors(cls) -> List[str]:
+        """Problems with GENIE_SPACES, GENIE_FANOUT_MODE and GENIE_SPACE_TIMEOUT"""
+        errors = []
+        names = set()
+        for entry in os.getenv("GENIE_SPACES", "").split(","):
+            if not entry.strip():
+                continue
+            name, separator, rest = entry.partition("=")
+            space_id = rest.partition(":")[0]
+            if not separator or not name.strip() or not space_id.strip():
+                errors.append(f"GENIE_SPACES entry '{entry.strip()}' is not name=space_id")
+            elif name.strip() in names:
+                errors.append(f"GENIE_SPACES lists '{name.strip()}' more than once")
+            names.add(name.strip())
+        
+        mode = os.getenv("GENIE_FANOUT_MODE", "first").strip().lower()
+        if mode not in ("first", "merge"):
+            errors.append(f"GENIE_FANOUT_MODE must be 'first' or 'merge', not '{mode}'")
+        
+        timeout = os.getenv("GENIE_SPACE_TIMEOUT", "60")
+        try:
+            if float(timeout) <= 0:
+                errors.append("GENIE_SPACE_TIMEOUT must be greater than zero")
+        except ValueError:
+            errors.append(f"GENIE_SPACE_TIMEOUT must be a number of seconds, not '{timeout}'")
+        return errors
+    
+    @classmethod
+    def get_fanout_config(cls) -> Dict[str, Any]:
+        """How questions are fanned out when several spaces are configured; check get_genie_space_errors first"""
+        return {
+            'timeout': float(os.getenv("GENIE_SPACE_TIMEOUT", "60")),  # seconds per space
+            'mode': os.getenv("GENIE_FANOUT_MODE", "first").strip().lower()  # first | merge
+        }
+    
+    @classmethod
+    def get_chart_config(cls) -> Dict[str, int]:
+        """Limits for automatic charts, read when called so values from .env apply"""
         return {
-            'valid': len(missing_vars) == 0,
-            'missing_vars': missing_vars
+            'max_points': int(os.getenv("AUTO_CHART_MAX_POINTS", "1000")),  # points sent to the browser per chart
+            'max_rows': int(os.getenv("AUTO_CHART_MAX_ROWS", "100000"))  # rows read for a full-result chart
         }
     
     @classmethod
@@ -57,7 +141,9 @@ class Config:
         return {
             'tenant_id': cls.TENANT_ID,
             'client_id': cls.CLIENT_ID,
-            'scope': cls.SCOPE
+            'scope': cls.SCOPE,
+            'authority_host': cls.AZURE_AUTHORITY_HOST,
+            'graph_api_url': cls.GRAPH_API_URL
         }
     
     @classmethod
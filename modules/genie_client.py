@@ -5,75 +5,120 @@ import os
 import json
 import asyncio
 import logging
-from typing import Optional, Dict, Tuple
-import streamlit as st
-from databricks.sdk import WorkspaceClient
-from databricks.sdk.service.dashboards import GenieAPI
+import threading
+from contextvars import ContextVar
+from datetime import timedelta
+from functools import partial
+from typing import Optional, Dict, Tuple, Callable
+from .tracing import get_tracer, current_span, traced
+from .metrics import metrics
 
 logger = logging.getLogger(__name__)
 
+# Set by a caller that times a request from when its first SDK call leaves the executor queue
+call_started: ContextVar[Optional[asyncio.Event]] = ContextVar("genie_call_started", default=None)
+
 
 class GenieClient:
     """Handles Databricks Genie API interactions"""
     
-    def __init__(self, oauth_token: str):
+    def __init__(self, oauth_token: str, space_id: Optional[str] = None, workspace_client=None,
+                 wait_timeout: Optional[float] = None):
         self.oauth_token = oauth_token
-        self.workspace_client = None
+        self.workspace_client = workspace_client
         self.genie_api = None
-        self.space_id = os.getenv("GENIE_SPACE_ID")
+        self.init_error = None
+        self.space_id = space_id or os.getenv("GENIE_SPACE_ID")
+        # Seconds the SDK keeps polling a message before giving up (SDK default: 20 minutes)
+        self.wait_timeout = wait_timeout
         self._initialize_clients()
     
     def _initialize_clients(self):
-        """Initialize workspace and Genie clients"""
+        """Initialize workspace and Genie clients, reusing a shared workspace client if one was given"""
         try:
-            self.workspace_client = WorkspaceClient(
-                host=os.getenv("DATABRICKS_HOST"),
-                token=self.oauth_token
-            )
+            # Imported here so the SDK is only loaded once a user has signed in
+            from databricks.sdk import WorkspaceClient
+            from databricks.sdk.service.dashboards import GenieAPI
             
-            # Store workspace client in session state for async functions
-            st.session_state.workspace_client = self.workspace_client
+            if self.workspace_client is None:
+                self.workspace_client = WorkspaceClient(
+                    host=os.getenv("DATABRICKS_HOST"),
+                    token=self.oauth_token
+                )
             
             self.genie_api = GenieAPI(self.workspace_client.api_client)
             return True
         except Exception as e:
+            metrics.record_error("genie", e)
             logger.error(f"Failed to initialize Genie client: {str(e)}")
-            st.error(f"Failed to initialize Genie client: {str(e)}")
+            self.init_error = f"Failed to initialize Genie client: {str(e)}"
             return False
     
+    async def _run_in_executor(self, span_name: str, func, *args):
+        """Run a blocking SDK call in the default executor inside a tracing span"""
+        loop = asyncio.get_running_loop()
+        started = call_started.get()
+        lock = threading.Lock()
+        queued = [True]
+        
+        def leave_queue():
+            # Called by the worker when the call starts and by the caller when it stops waiting;
+            # whichever comes first takes the call off the gauge
+            with lock:
+                if not queued[0]:
+                    return
+                queued[0] = False
+            metrics.executor_queue_depth.dec()
+        
+        def run_when_scheduled():
+            leave_queue()
+            if started is not None:
+                loop.call_soon_threadsafe(started.set)
+            return func(*args)
+        
+        with get_tracer().start_as_current_span(span_name, space_id=self.space_id):
+            metrics.executor_queue_depth.inc()
+            try:
+                return await loop.run_in_executor(None, run_when_scheduled)
+            finally:
+                # A call cancelled while still queued never runs run_when_scheduled
+                leave_queue()
+    
+    @traced("genie.ask_genie_async")
     async def ask_genie_async(self, question: str, conversation_id: Optional[str] = None) -> Tuple[str, str]:
         """Async function to ask Genie and get structured response"""
         try:
-            loop = asyncio.get_running_loop()
-            
             if not self.workspace_client or not self.genie_api:
                 return json.dumps({"error": "Workspace client not initialized"}), conversation_id
             
+            wait_kwargs = {"timeout": timedelta(seconds=self.wait_timeout)} if self.wait_timeout else {}
             if conversation_id is None:
-                initial_message = await loop.run_in_executor(
-                    None, self.genie_api.start_conversation_and_wait, self.space_id, question
+                initial_message = await self._run_in_executor(
+                    "genie.start_conversation_and_wait",
+                    partial(self.genie_api.start_conversation_and_wait, **wait_kwargs), self.space_id, question
                 )
                 conversation_id = initial_message.conversation_id
             else:
-                initial_message = await loop.run_in_executor(
-                    None, self.genie_api.create_message_and_wait, self.space_id, conversation_id, question
+                initial_message = await self._run_in_executor(
+                    "genie.create_message_and_wait",
+                    partial(self.genie_api.create_message_and_wait, **wait_kwargs), self.space_id, conversation_id, question
                 )
 
             query_result = None
             if initial_message.query_result is not None:
-                query_result = await loop.run_in_executor(
-                    None, self.genie_api.get_message_query_result,
+                query_result = await self._run_in_executor(
+                    "genie.get_message_query_result", self.genie_api.get_message_query_result,
                     self.space_id, initial_message.conversation_id, initial_message.id
                 )
 
-            message_content = await loop.run_in_executor(
-                None, self.genie_api.get_message,
+            message_content = await self._run_in_executor(
+                "genie.get_message", self.genie_api.get_message,
                 self.space_id, initial_message.conversation_id, initial_message.id
             )
 
             if query_result and query_result.statement_response:
-                results = await loop.run_in_executor(
-                    None, self.workspace_client.statement_execution.get_statement,
+                results = await self._run_in_executor(
+                    "statement_execution.get_statement", self.workspace_client.statement_execution.get_statement,
                     query_result.statement_response.statement_id
                 )
                 
@@ -86,7 +131,9 @@ class GenieClient:
                 return json.dumps({
                     "columns": results.manifest.schema.as_dict(),
                     "data": results.result.as_dict(),
-                    "query_description": query_description
+                    "query_description": query_description,
+                    "statement_id": results.statement_id,
+                    "total_row_count": results.manifest.total_row_count
                 }), conversation_id
 
             if message_content.attachments:
@@ -96,42 +143,46 @@ class GenieClient:
 
             return json.dumps({"message": message_content.content}), conversation_id
         except Exception as e:
+            current_span().record_exception(e)
+            metrics.record_error("genie", e)
             logger.error(f"Error in ask_genie: {str(e)}")
             return json.dumps({"error": "An error occurred while processing your request."}), conversation_id
     
-    def ask_genie(self, question: str, max_wait_time: int = 60) -> Dict:
-        """Synchronous wrapper for the async ask_genie function"""
+    @traced("genie.ask_genie")
+    def ask_genie(self, question: str, max_wait_time: int = 60,
+                  progress_callback: Optional[Callable[[float, str], None]] = None) -> Dict:
+        """Synchronous wrapper for the async ask_genie function
+        
+        progress_callback, if given, is called with (fraction, status text) as the request advances.
+        """
+        def report(fraction: float, text: str):
+            if progress_callback:
+                progress_callback(fraction, text)
+        
+        metrics.genie_in_flight.inc()
         try:
-            # Show progress
-            progress_bar = st.progress(0)
-            status_text = st.empty()
-            status_text.text("🧞 Iniciando conversa com Genie...")
-            progress_bar.progress(0.1)
+            report(0.1, "🧞 Iniciando conversa com Genie...")
             
             # Run the async function
             loop = asyncio.new_event_loop()
             asyncio.set_event_loop(loop)
             
             try:
-                status_text.text("🤖 Processando consulta...")
-                progress_bar.progress(0.5)
+                report(0.5, "🤖 Processando consulta...")
                 
                 answer_json_str, conversation_id = loop.run_until_complete(
                     self.ask_genie_async(question)
                 )
                 
-                progress_bar.progress(0.9)
-                status_text.text("✅ Formatando resposta...")
+                report(0.9, "✅ Formatando resposta...")
                 
                 # Parse the JSON response
-                answer_json = json.loads(answer_json_str)
+                with get_tracer().start_as_current_span("genie.parse_response", response_bytes=len(answer_json_str)):
+                    answer_json = json.loads(answer_json_str)
                 
-                progress_bar.progress(1.0)
-                status_text.text("✅ Concluído!")
-                
-                progress_bar.empty()
-                status_text.empty()
+                report(1.0, "✅ Concluído!")
                 
+                metrics.genie_requests.inc(outcome="error" if "error" in answer_json else "success")
                 return {
                     "success": True,
                     "response": answer_json,
@@ -143,13 +194,13 @@ class GenieClient:
                 loop.close()
                 
         except Exception as e:
-            if 'progress_bar' in locals():
-                progress_bar.empty()
-            if 'status_text' in locals():
-                status_text.empty()
-                
+            current_span().record_exception(e)
+            metrics.record_error("genie", e)
+            metrics.genie_requests.inc(outcome="error")
             logger.error(f"Error in ask_genie wrapper: {str(e)}")
             return {
                 "success": False,
                 "error": f"Erro ao processar solicitação: {str(e)}"
             }
+        finally:
+            metrics.genie_in_flight.dec()
@@ -0,0 +1,130 @@
+"""
+Fan-out of one question to several Genie spaces
+"""
+import json
+import asyncio
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+from .genie_client import GenieClient, call_started
+from .tracing import get_tracer, current_span, traced
+from .metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# first: answer with the first space that returns rows; merge: wait for every space and show all answers
+FANOUT_MODES = ("first", "merge")
+
+
+def is_useful(answer: Dict[str, Any]) -> bool:
+    """Whether an answer is a query result with rows, the kind that ends a "first" fan-out"""
+    if "error" in answer or "columns" not in answer or "data" not in answer:
+        return False
+    return bool(answer.get("total_row_count") or answer["data"].get("data_array"))
+
+
+class GenieFanout(GenieClient):
+    """Asks several Genie spaces at once, sharing one workspace client and its connection pool"""
+
+    def __init__(self, oauth_token: str, spaces: List[Dict[str, Any]], timeout: float = 60.0, mode: str = "first"):
+        if mode not in FANOUT_MODES:
+            raise ValueError(f"Unknown fan-out mode: {mode} (expected one of {', '.join(FANOUT_MODES)})")
+        super().__init__(oauth_token, space_id=spaces[0]["space_id"], wait_timeout=timeout)
+        self.spaces = spaces
+        self.timeout = timeout
+        self.mode = mode
+        self.clients: Dict[str, GenieClient] = {}
+        if self.workspace_client is not None:
+            for space in spaces:
+                self.clients[space["name"]] = GenieClient(
+                    oauth_token, space_id=space["space_id"],
+                    workspace_client=self.workspace_client, wait_timeout=timeout
+                )
+
+    def select_spaces(self, question: str) -> List[Dict[str, Any]]:
+        """Spaces whose keywords appear in the question, or every space when none match"""
+        text = question.lower()
+        matched = [space for space in self.spaces if any(keyword in text for keyword in space["keywords"])]
+        return matched or self.spaces
+
+    async def _ask_space(self, space: Dict[str, Any], question: str) -> Tuple[str, Dict[str, Any], Optional[str]]:
+        """Ask one space within the per-space timeout and count the outcome
+
+        The timeout starts once the space's first SDK call is running, so time
+        spent waiting for a free executor thread does not count against it.
+        """
+        name = space["name"]
+        with get_tracer().start_as_current_span(f"genie.space[{name}]", space=name, space_id=space["space_id"]):
+            started = asyncio.Event()
+            call_started.set(started)
+            # The task copies the current context, so its executor calls signal `started`
+            ask = asyncio.ensure_future(self.clients[name].ask_genie_async(question))
+            try:
+                started_wait = asyncio.ensure_future(started.wait())
+                try:
+                    await asyncio.wait([ask, started_wait], return_when=asyncio.FIRST_COMPLETED)
+                finally:
+                    started_wait.cancel()
+                answer_json_str, conversation_id = await asyncio.wait_for(ask, self.timeout)
+            except asyncio.TimeoutError:
+                metrics.space_requests.inc(space=name, outcome="timeout")
+                logger.warning(f"Genie space {name} did not answer within {self.timeout:g}s")
+                return name, {"error": f"Sem resposta em {self.timeout:g}s"}, None
+            except asyncio.CancelledError:
+                ask.cancel()
+                metrics.space_requests.inc(space=name, outcome="cancelled")
+                raise
+
+        answer = json.loads(answer_json_str)
+        if "error" in answer:
+            outcome = "error"
+        elif is_useful(answer):
+            outcome = "useful"
+        else:
+            outcome = "message"
+        metrics.space_requests.inc(space=name, outcome=outcome)
+        return name, answer, conversation_id
+
+    @traced("genie.fanout")
+    async def ask_genie_async(self, question: str, conversation_id: Optional[str] = None) -> Tuple[str, Optional[str]]:
+        """Ask the relevant spaces concurrently and combine their answers according to the mode
+
+        Every question starts a new conversation in each space, so
+        conversation_id is ignored. The returned conversation id belongs to
+        the space that answered ("first") or is None ("merge").
+        """
+        if not self.clients:
+            return json.dumps({"error": "Workspace client not initialized"}), None
+
+        spaces = self.select_spaces(question)
+        current_span().set_attribute("spaces", ",".join(space["name"] for space in spaces))
+        tasks = [asyncio.create_task(self._ask_space(space, question)) for space in spaces]
+
+        if self.mode == "merge":
+            results = await asyncio.gather(*tasks)
+            answers = [dict(answer, space=name, conversation_id=space_conversation_id)
+                       for name, answer, space_conversation_id in results]
+            return json.dumps({"answers": answers}), None
+
+        message = None
+        errors = []
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                name, answer, space_conversation_id = await next_done
+                if is_useful(answer):
+                    return json.dumps(dict(answer, space=name)), space_conversation_id
+                if "error" in answer:
+                    errors.append(f"{name}: {answer['error']}")
+                elif message is None:
+                    message = (name, answer, space_conversation_id)
+        finally:
+            # Stop waiting on the slower spaces; their SDK polls end at the same timeout
+            pending = [task for task in tasks if not task.done()]
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+
+        if message is not None:
+            name, answer, space_conversation_id = message
+            return json.dumps(dict(answer, space=name)), space_conversation_id
+        return json.dumps({"error": "; ".join(errors)}), None
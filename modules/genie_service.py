@@ -0,0 +1,140 @@
+"""
+Streamlit-free service layer for asking Genie and formatting the answers
+"""
+import json
+import logging
+from contextlib import closing
+from typing import Optional, Dict, Callable, Any
+from .config import Config
+from .genie_client import GenieClient
+from .genie_fanout import GenieFanout
+from .response_formatter import ResponseFormatter
+from .result_export import StatementResultExporter
+from .metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class GenieService:
+    """Narrow interface over GenieClient and ResponseFormatter used by the UI, the CLI and workers"""
+
+    def __init__(self, oauth_token: str, formatter: Optional[ResponseFormatter] = None):
+        self.client = None
+        self.config_error = None
+        self.formatter = formatter or ResponseFormatter()
+
+        space_errors = Config.get_genie_space_errors()
+        if space_errors:
+            self.config_error = "Invalid Genie space configuration: " + "; ".join(space_errors)
+            logger.error(self.config_error)
+        else:
+            spaces = Config.get_genie_spaces()
+            if len(spaces) > 1:
+                fanout = Config.get_fanout_config()
+                self.client = GenieFanout(oauth_token, spaces, timeout=fanout['timeout'], mode=fanout['mode'])
+            else:
+                self.client = GenieClient(oauth_token, space_id=spaces[0]['space_id'] if spaces else None)
+        self.exporter = StatementResultExporter(self.client.workspace_client if self.client else None)
+
+    @property
+    def available(self) -> bool:
+        """Whether the workspace and Genie clients were initialized"""
+        return (self.client is not None and self.client.workspace_client is not None
+                and self.client.genie_api is not None)
+
+    @property
+    def init_error(self) -> Optional[str]:
+        """Why the clients could not be initialized, if they could not"""
+        return self.config_error or self.client.init_error
+
+    def ask(self, question: str, progress_callback: Optional[Callable[[float, str], None]] = None,
+            chart: bool = False) -> Dict[str, Any]:
+        """Ask a question and add the formatted answer (and, if asked for, chart data) to the response
+
+        A merged fan-out answer also gets "sections": the space, statement id
+        and chart of each space's answer, for per-space downloads and charts.
+        """
+        response = self.client.ask_genie(question, progress_callback=progress_callback)
+        if response.get("success"):
+            answer_json = response["response"]
+            response["formatted"] = self.formatter.process_query_results(answer_json)
+            if chart:
+                response["chart"] = self.chart_for(answer_json)
+            if "answers" in answer_json:
+                response["sections"] = [
+                    {
+                        "space": answer.get("space"),
+                        "statement_id": answer.get("statement_id"),
+                        "chart": self.chart_for(answer) if chart else None
+                    }
+                    for answer in answer_json["answers"]
+                ]
+        return response
+
+    def chart_for(self, answer_json: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Downsampled chart of the rows that came inline with the answer, or None
+
+        Never fetches further chunks, so it adds no round trips to a question;
+        full_chart reads the whole result when the user asks for it.
+        """
+        # Imported here so numpy and pandas are only loaded when a chart is built
+        from .charting import detect_chart_columns, build_chart, pending_chart
+
+        columns = (answer_json.get("columns") or {}).get("columns")
+        spec = detect_chart_columns(columns) if columns else None
+        if spec is None:
+            return None
+
+        data_array = answer_json["data"].get("data_array") or []
+        if not data_array:
+            # EXTERNAL_LINKS results carry no inline rows; keep the spec so full_chart can be offered
+            total_rows = answer_json.get("total_row_count") or 0
+            return pending_chart(spec, total_rows) if total_rows and answer_json.get("statement_id") else None
+
+        try:
+            chart = build_chart(spec, [data_array], Config.get_chart_config()['max_points'])
+        except Exception as e:
+            metrics.record_error("chart", e)
+            logger.warning(f"Could not build chart: {str(e)}")
+            return None
+        if chart is not None:
+            chart["total_rows"] = max(answer_json.get("total_row_count") or 0, chart["source_rows"])
+            chart["full"] = chart["source_rows"] >= chart["total_rows"]
+        return chart
+
+    def full_chart(self, statement_id: str) -> Optional[Dict[str, Any]]:
+        """Downsampled chart of every chunk of a statement result, up to the configured row cap"""
+        from .charting import detect_chart_columns, build_chart
+
+        try:
+            statement = self.exporter.fetch_statement(statement_id)
+            spec = detect_chart_columns(statement.manifest.schema.as_dict().get("columns", []))
+            if spec is None:
+                return None
+            limits = Config.get_chart_config()
+            # Closed explicitly so a read stopped at the row cap releases the chunk iterator here
+            with closing(self.exporter.iter_row_blocks(statement)) as row_blocks:
+                chart = build_chart(spec, row_blocks, limits['max_points'], limits['max_rows'])
+        except Exception as e:
+            metrics.record_error("chart", e)
+            logger.warning(f"Could not build full chart: {str(e)}")
+            return None
+        if chart is not None:
+            chart["total_rows"] = max(statement.manifest.total_row_count or 0, chart["source_rows"])
+            chart["full"] = True
+        return chart
+
+    async def ask_async(self, question: str, conversation_id: Optional[str] = None) -> Dict[str, Any]:
+        """Ask a question from a running event loop and add the formatted answer"""
+        answer_json_str, conversation_id = await self.client.ask_genie_async(question, conversation_id)
+        answer_json = json.loads(answer_json_str)
+        return {
+            "success": True,
+            "response": answer_json,
+            "conversation_id": conversation_id,
+            "formatted": self.formatter.process_query_results(answer_json)
+        }
+
+    def export_result(self, statement_id: str, export_format: str):
+        """Stream the full result of a statement into a temporary CSV or Parquet file"""
+        return self.exporter.export_to_tempfile(statement_id, export_format)
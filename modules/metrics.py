@@ -0,0 +1,250 @@
+"""
+Operational metrics and Prometheus text endpoint for the Genie AI Chatbot
+"""
+import os
+import time
+import logging
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple, Any
+
+from .tracing import get_tracer
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds (seconds) of the Prometheus latency histogram buckets
+LATENCY_BUCKETS = [0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120]
+
+
+def _format_labels(labels: Tuple[Tuple[str, str], ...]) -> str:
+    if not labels:
+        return ""
+    escaped = []
+    for key, value in labels:
+        value = str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+        escaped.append(f'{key}="{value}"')
+    return "{" + ",".join(escaped) + "}"
+
+
+class Counter:
+    """Monotonically increasing counter with optional labels"""
+
+    metric_type = "counter"
+
+    def __init__(self, name: str, description: str):
+        self.name = name
+        self.description = description
+        self._values: Dict[Tuple[Tuple[str, str], ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(tuple(sorted(labels.items())), 0)
+
+    def values(self) -> Dict[Tuple[Tuple[str, str], ...], float]:
+        with self._lock:
+            return dict(self._values)
+
+    def total(self) -> float:
+        return sum(self.values().values())
+
+
+class Gauge(Counter):
+    """Value that can go up and down"""
+
+    metric_type = "gauge"
+
+    def dec(self, amount: float = 1, **labels):
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            self._values[key] = value
+
+
+class SessionTracker:
+    """Tracks Streamlit sessions by heartbeat, since sessions have no close hook"""
+
+    def __init__(self, idle_timeout: float = 1800):
+        self.idle_timeout = idle_timeout
+        self._sessions: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def touch(self, session_id: str, result_bytes: int = 0):
+        """Record activity from a session and the result bytes it holds"""
+        with self._lock:
+            self._sessions[session_id] = {"last_seen": time.time(), "result_bytes": result_bytes}
+
+    def _prune(self):
+        cutoff = time.time() - self.idle_timeout
+        for session_id in [s for s, info in self._sessions.items() if info["last_seen"] < cutoff]:
+            del self._sessions[session_id]
+
+    def active_sessions(self) -> int:
+        with self._lock:
+            self._prune()
+            return len(self._sessions)
+
+    def result_bytes(self) -> int:
+        with self._lock:
+            self._prune()
+            return sum(info["result_bytes"] for info in self._sessions.values())
+
+
+class MetricsRegistry:
+    """Process-wide operational counters"""
+
+    def __init__(self):
+        self.sessions = SessionTracker(float(os.getenv("SESSION_IDLE_TIMEOUT", "1800")))
+        self.genie_in_flight = Gauge("genie_in_flight_calls", "Genie questions currently being processed")
+        self.executor_queue_depth = Gauge("genie_executor_queue_depth", "SDK calls waiting for an executor thread")
+        self.cache_requests = Counter("genie_cache_requests_total", "Cache lookups by cache and result")
+        self.token_refreshes = Counter("genie_token_refreshes_total", "Access tokens obtained from Azure AD")
+        self.errors = Counter("genie_errors_total", "Errors by component and exception class")
+        self.genie_requests = Counter("genie_requests_total", "Genie questions by outcome")
+        self.exported_rows = Counter("genie_exported_rows_total", "Result rows written by exports, by format")
+        self.space_requests = Counter("genie_space_requests_total", "Fan-out questions per Genie space by outcome")
+
+    def record_error(self, component: str, error: BaseException):
+        """Count an error by the component it happened in and its class"""
+        self.errors.inc(component=component, error_class=type(error).__name__)
+
+    def record_cache(self, cache: str, hit: bool):
+        """Count a lookup in a real cache (one that can miss for data it has seen before)"""
+        self.cache_requests.inc(cache=cache, result="hit" if hit else "miss")
+
+    def cache_hit_ratio(self) -> Optional[float]:
+        """Ratio of hits over all cache lookups, or None before the first lookup"""
+        values = self.cache_requests.values()
+        total = sum(values.values())
+        if not total:
+            return None
+        hits = sum(n for labels, n in values.items() if dict(labels).get("result") == "hit")
+        return hits / total
+
+    def errors_by_class(self) -> Dict[str, float]:
+        """Error counts aggregated by exception class"""
+        totals: Dict[str, float] = {}
+        for labels, n in self.errors.values().items():
+            error_class = dict(labels).get("error_class", "unknown")
+            totals[error_class] = totals.get(error_class, 0) + n
+        return totals
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Summary used by the admin panel"""
+        return {
+            "active_sessions": self.sessions.active_sessions(),
+            "in_flight_calls": int(self.genie_in_flight.total()),
+            "queue_depth": int(self.executor_queue_depth.total()),
+            "cache_hit_ratio": self.cache_hit_ratio(),
+            "result_bytes": self.sessions.result_bytes(),
+            "token_refreshes": int(self.token_refreshes.total()),
+            "errors_by_class": self.errors_by_class(),
+            "space_requests": self.space_requests_by_space(),
+            "latency": get_tracer().latency_summary()
+        }
+
+    def space_requests_by_space(self) -> Dict[str, Dict[str, int]]:
+        """Fan-out outcome counts keyed by space name"""
+        by_space: Dict[str, Dict[str, int]] = {}
+        for labels, count in self.space_requests.values().items():
+            labels = dict(labels)
+            by_space.setdefault(labels.get("space", "unknown"), {})[labels.get("outcome", "unknown")] = int(count)
+        return by_space
+
+    def _metrics(self) -> List[Counter]:
+        return [
+            self.genie_in_flight, self.executor_queue_depth, self.cache_requests,
+            self.token_refreshes, self.errors, self.genie_requests, self.exported_rows, self.space_requests
+        ]
+
+    def render_prometheus(self) -> str:
+        """Render all metrics in the Prometheus text exposition format"""
+        lines = [
+            "# HELP genie_active_sessions Sessions seen within the idle timeout",
+            "# TYPE genie_active_sessions gauge",
+            f"genie_active_sessions {self.sessions.active_sessions()}",
+            "# HELP genie_session_result_bytes Bytes of chat results held in session state",
+            "# TYPE genie_session_result_bytes gauge",
+            f"genie_session_result_bytes {self.sessions.result_bytes()}",
+        ]
+        for metric in self._metrics():
+            lines.append(f"# HELP {metric.name} {metric.description}")
+            lines.append(f"# TYPE {metric.name} {metric.metric_type}")
+            values = metric.values()
+            if not values and metric.metric_type == "gauge":
+                values = {(): 0}
+            for labels, value in sorted(values.items()):
+                lines.append(f"{metric.name}{_format_labels(labels)} {value:g}")
+
+        lines.append("# HELP genie_stage_latency_seconds Latency of traced pipeline stages")
+        lines.append("# TYPE genie_stage_latency_seconds histogram")
+        for stage, histogram in sorted(get_tracer().histograms().items()):
+            counts = histogram.cumulative_counts(LATENCY_BUCKETS)
+            for bound, count in zip(LATENCY_BUCKETS, counts):
+                labels = (("stage", stage), ("le", f"{bound:g}"))
+                lines.append(f"genie_stage_latency_seconds_bucket{_format_labels(labels)} {count}")
+            lines.append(f'genie_stage_latency_seconds_bucket{_format_labels((("stage", stage), ("le", "+Inf")))} {histogram.count}')
+            lines.append(f'genie_stage_latency_seconds_sum{_format_labels((("stage", stage),))} {histogram.total_us / 1_000_000:g}')
+            lines.append(f'genie_stage_latency_seconds_count{_format_labels((("stage", stage),))} {histogram.count}')
+        return "\n".join(lines) + "\n"
+
+
+metrics = MetricsRegistry()
+
+
+class _MetricsRequestHandler(BaseHTTPRequestHandler):
+    """Serves /metrics from the process-wide registry"""
+
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = metrics.render_prometheus().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        logger.debug(format % args)
+
+
+_server: Optional[ThreadingHTTPServer] = None
+_server_started = False
+_server_lock = threading.Lock()
+
+
+def start_metrics_server(port: Optional[int] = None, host: Optional[str] = None) -> Optional[ThreadingHTTPServer]:
+    """Start the /metrics endpoint once per process in a daemon thread
+
+    Streamlit re-executes the app script on every interaction, so this is safe
+    to call from the script body. Set METRICS_PORT=0 to disable the endpoint.
+    """
+    global _server, _server_started
+    if port is None:
+        port = int(os.getenv("METRICS_PORT", "9464"))
+    if host is None:
+        host = os.getenv("METRICS_HOST", "0.0.0.0")
+    if port <= 0:
+        return None
+
+    with _server_lock:
+        if _server_started:
+            return _server
+        _server_started = True
+        try:
+            _server = ThreadingHTTPServer((host, port), _MetricsRequestHandler)
+        except OSError as e:
+            logger.error(f"Failed to start metrics endpoint on {host}:{port}: {str(e)}")
+            return None
+        _server.daemon_threads = True
+        threading.Thread(target=_server.serve_forever, name="metrics-server", daemon=True).start()
+        logger.info(f"Metrics endpoint listening on http://{host}:{port}/metrics")
+        return _server
@@ -2,18 +2,31 @@
 Response formatting utilities for Genie API responses
 """
 from typing import Dict
+from .tracing import traced
 
 
 class ResponseFormatter:
     """Formats Genie API responses into user-friendly output"""
     
     @staticmethod
+    @traced("formatter.process_query_results")
     def process_query_results(answer_json: Dict) -> str:
         """Process and format the query results from Genie"""
         from .config import Config
         
         response = ""
         
+        if "answers" in answer_json:
+            # One section per Genie space from a merged fan-out
+            sections = []
+            for answer in answer_json["answers"]:
+                section = {key: value for key, value in answer.items() if key != "space"}
+                sections.append(f"**📂 {answer['space']}**\n\n" + ResponseFormatter.process_query_results(section))
+            return "\n\n---\n\n".join(sections)
+        
+        if "space" in answer_json:
+            response += f"*📂 Espaço: {answer_json['space']}*\n\n"
+        
         if "columns" in answer_json and "data" in answer_json:
             columns = answer_json["columns"]
             data = answer_json["data"]
@@ -28,7 +41,9 @@ class ResponseFormatter:
                 row_count = 0
                 max_rows = Config.MAX_DISPLAY_ROWS  # Use config value
                 
-                for row in data["data_array"]:
+                # Large results arrive as external links with no inline rows
+                data_array = data.get("data_array") or []
+                for row in data_array:
                     if row_count >= max_rows:
                         break
                         
@@ -48,9 +63,9 @@ class ResponseFormatter:
                     row_count += 1
                 
                 # Only show truncation message if there are more rows
-                total_rows = len(data["data_array"])
-                if total_rows > max_rows:
-                    response += f"\n*Mostrando {max_rows} de {total_rows} linhas*\n"
+                total_rows = answer_json.get("total_row_count") or len(data_array)
+                if total_rows > row_count:
+                    response += f"\n*Mostrando {row_count} de {total_rows} linhas. Use ⬇️ CSV ou ⬇️ Parquet para baixar todas.*\n"
                     
             else:
                 response += f"Formato de coluna inesperado: {columns}\n\n"
@@ -0,0 +1,188 @@
+"""
+Streamed export of full statement results to CSV or Parquet
+"""
+import io
+import csv
+import logging
+import tempfile
+from contextlib import closing
+from typing import Dict, Iterator, List, Optional, Any
+
+import requests
+
+from .tracing import get_tracer, traced
+from .metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# Export formats and the MIME type of the file each produces
+EXPORT_FORMATS = {
+    "csv": "text/csv",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+# Seconds to wait for one external link download
+EXTERNAL_LINK_TIMEOUT = 60
+
+
+def _parquet_type(pa, column: Dict[str, Any]):
+    """pyarrow type for a manifest column; anything unrecognized stays a string"""
+    type_name = column.get("type_name")
+    if type_name in ("BYTE", "SHORT", "INT", "LONG"):
+        return pa.int64()
+    if type_name in ("FLOAT", "DOUBLE"):
+        return pa.float64()
+    if type_name == "DECIMAL" and column.get("type_precision"):
+        return pa.decimal128(column["type_precision"], column.get("type_scale") or 0)
+    if type_name == "BOOLEAN":
+        return pa.bool_()
+    if type_name == "DATE":
+        return pa.date32()
+    if type_name == "TIMESTAMP":
+        return pa.timestamp("us", tz="UTC")
+    return pa.string()
+
+
+class CsvExportWriter:
+    """Writes row blocks as CSV with a header row"""
+
+    def __init__(self, fileobj, columns: List[Dict[str, Any]]):
+        self.text = io.TextIOWrapper(fileobj, encoding="utf-8", newline="", write_through=True)
+        self.writer = csv.writer(self.text)
+        self.writer.writerow([column["name"] for column in columns])
+
+    def write_rows(self, rows: List[List[Any]]):
+        self.writer.writerows(rows)
+
+    def close(self):
+        # Detach so closing the wrapper does not close the caller's file
+        self.text.flush()
+        self.text.detach()
+
+
+class ParquetExportWriter:
+    """Writes each row block as one Parquet row group typed from the manifest schema"""
+
+    def __init__(self, fileobj, columns: List[Dict[str, Any]]):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise RuntimeError("Parquet export requires pyarrow: pip install pyarrow")
+        self.pa = pa
+        self.schema = pa.schema([(column["name"], _parquet_type(pa, column)) for column in columns])
+        self.writer = pq.ParquetWriter(fileobj, self.schema)
+
+    def write_rows(self, rows: List[List[Any]]):
+        if not rows:
+            return
+        # JSON_ARRAY results carry every value as a string, so build string
+        # columns and let Arrow cast them to the manifest types
+        arrays = []
+        for position, field in enumerate(self.schema):
+            values = [None if row[position] is None else str(row[position]) for row in rows]
+            arrays.append(self.pa.array(values, type=self.pa.string()).cast(field.type))
+        self.writer.write_table(self.pa.Table.from_arrays(arrays, schema=self.schema))
+
+    def close(self):
+        self.writer.close()
+
+
+EXPORT_WRITERS = {
+    "csv": CsvExportWriter,
+    "parquet": ParquetExportWriter,
+}
+
+
+class StatementResultExporter:
+    """Streams every chunk of a statement result into an export file"""
+
+    def __init__(self, workspace_client, http: Optional[requests.Session] = None):
+        self.workspace_client = workspace_client
+        self.http = http or requests.Session()
+
+    def _external_rows(self, url: str, result_format: str) -> Iterator[List[List[Any]]]:
+        """Download one external link and yield its rows, one Arrow record batch at a time"""
+        # The span covers only the request and opening the stream: a generator
+        # suspended inside it would leave the span current for its consumer
+        # External links are presigned; sending the workspace token would be rejected
+        with get_tracer().start_as_current_span("export.fetch_external_link", format=result_format):
+            response = self.http.get(url, stream=True, timeout=EXTERNAL_LINK_TIMEOUT)
+            try:
+                response.raise_for_status()
+                if result_format == "ARROW_STREAM":
+                    import pyarrow.ipc as ipc
+                    reader = ipc.open_stream(response.raw)
+                else:
+                    rows = response.json()
+            except Exception:
+                response.close()
+                raise
+
+        try:
+            if result_format == "ARROW_STREAM":
+                for batch in reader:
+                    columns = [column.to_pylist() for column in batch.columns]
+                    yield [list(row) for row in zip(*columns)]
+            else:
+                yield rows
+        finally:
+            response.close()
+
+    def fetch_statement(self, statement_id: str):
+        """Get the statement with its manifest and first chunk"""
+        with get_tracer().start_as_current_span("export.get_statement", statement_id=statement_id):
+            return self.workspace_client.statement_execution.get_statement(statement_id)
+
+    def iter_row_blocks(self, statement) -> Iterator[List[List[Any]]]:
+        """Yield the result of a fetched statement one chunk (or external link) at a time, in order"""
+        statement_execution = self.workspace_client.statement_execution
+        chunk = statement.result
+        result_format = statement.manifest.format.value if statement.manifest.format else "JSON_ARRAY"
+        while chunk is not None:
+            if chunk.data_array is not None:
+                yield chunk.data_array
+            next_chunk_index = chunk.next_chunk_index
+            for link in chunk.external_links or []:
+                yield from self._external_rows(link.external_link, result_format)
+                if next_chunk_index is None:
+                    next_chunk_index = link.next_chunk_index
+            if next_chunk_index is None:
+                break
+            with get_tracer().start_as_current_span("export.fetch_chunk", chunk_index=next_chunk_index):
+                chunk = statement_execution.get_statement_result_chunk_n(statement.statement_id, next_chunk_index)
+
+    @traced("export.statement_result")
+    def export(self, statement_id: str, export_format: str, fileobj) -> int:
+        """Write the full result of `statement_id` to a binary file object; returns the row count"""
+        if export_format not in EXPORT_WRITERS:
+            raise ValueError(f"Unsupported export format: {export_format}")
+
+        statement = self.fetch_statement(statement_id)
+        columns = statement.manifest.schema.as_dict().get("columns", [])
+
+        writer = EXPORT_WRITERS[export_format](fileobj, columns)
+        row_count = 0
+        try:
+            with closing(self.iter_row_blocks(statement)) as row_blocks:
+                for rows in row_blocks:
+                    writer.write_rows(rows)
+                    row_count += len(rows)
+        finally:
+            writer.close()
+
+        metrics.exported_rows.inc(row_count, format=export_format)
+        logger.info(f"Exported {row_count} rows of statement {statement_id} as {export_format}")
+        return row_count
+
+    def export_to_tempfile(self, statement_id: str, export_format: str):
+        """Export into an anonymous temporary file on disk, rewound for reading"""
+        fileobj = tempfile.TemporaryFile()
+        try:
+            self.export(statement_id, export_format, fileobj)
+        except Exception as e:
+            fileobj.close()
+            metrics.record_error("export", e)
+            raise
+        fileobj.seek(0)
+        return fileobj
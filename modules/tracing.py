@@ -0,0 +1,304 @@
+"""
+Tracing spans and latency histograms for the Genie AI Chatbot
+"""
+import os
+import sys
+import json
+import math
+import time
+import random
+import asyncio
+import logging
+import threading
+import functools
+import contextvars
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Any, Iterator
+
+logger = logging.getLogger(__name__)
+
+_current_span: contextvars.ContextVar = contextvars.ContextVar("genie_current_span", default=None)
+
+
+class Span:
+    """A single timed operation, shaped like an OpenTelemetry span"""
+
+    def __init__(self, name: str, parent: Optional["Span"] = None, attributes: Optional[Dict[str, Any]] = None):
+        self.name = name
+        self.trace_id = parent.trace_id if parent else f"{random.getrandbits(128):032x}"
+        self.span_id = f"{random.getrandbits(64):016x}"
+        self.parent_id = parent.span_id if parent else None
+        self.attributes = dict(attributes or {})
+        self.status_code = "UNSET"
+        self.status_description = None
+        self.events: List[Dict] = []
+        self.start_time = time.time_ns()
+        self.end_time = None
+        self._start_perf = time.perf_counter()
+        self.duration = None
+
+    def set_attribute(self, key: str, value: Any):
+        """Set an attribute on the span"""
+        self.attributes[key] = value
+
+    def record_exception(self, exc: BaseException):
+        """Record an exception event and mark the span as failed"""
+        self.status_code = "ERROR"
+        self.status_description = f"{type(exc).__name__}: {exc}"
+        self.events.append({
+            "name": "exception",
+            "timestamp": time.time_ns(),
+            "attributes": {
+                "exception.type": type(exc).__name__,
+                "exception.message": str(exc)
+            }
+        })
+
+    def end(self):
+        """End the span"""
+        if self.end_time is None:
+            self.duration = time.perf_counter() - self._start_perf
+            self.end_time = time.time_ns()
+            if self.status_code == "UNSET":
+                self.status_code = "OK"
+
+    def to_dict(self, resource: Optional[Dict[str, Any]] = None) -> Dict:
+        """Serialize the span in the OpenTelemetry console exporter layout"""
+        return {
+            "name": self.name,
+            "context": {
+                "trace_id": f"0x{self.trace_id}",
+                "span_id": f"0x{self.span_id}"
+            },
+            "kind": "SpanKind.INTERNAL",
+            "parent_id": f"0x{self.parent_id}" if self.parent_id else None,
+            "start_time_unix_nano": self.start_time,
+            "end_time_unix_nano": self.end_time,
+            "duration_ms": round(self.duration * 1000, 3) if self.duration is not None else None,
+            "status": {
+                "status_code": self.status_code,
+                "description": self.status_description
+            },
+            "attributes": self.attributes,
+            "events": self.events,
+            "resource": {"attributes": resource or {}}
+        }
+
+
+class NoOpSpanExporter:
+    """Discards finished spans"""
+
+    def export(self, span_dict: Dict):
+        pass
+
+
+class ConsoleSpanExporter:
+    """Writes finished spans to stdout as JSON"""
+
+    def __init__(self, stream=None):
+        self.stream = stream or sys.stdout
+        self._lock = threading.Lock()
+
+    def export(self, span_dict: Dict):
+        with self._lock:
+            self.stream.write(json.dumps(span_dict, default=str, indent=2) + "\n")
+            self.stream.flush()
+
+
+class JsonLinesSpanExporter:
+    """Appends finished spans to a JSON lines file"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def export(self, span_dict: Dict):
+        line = json.dumps(span_dict, default=str)
+        with self._lock:
+            try:
+                with open(self.path, "a", encoding="utf-8") as f:
+                    f.write(line + "\n")
+            except OSError as e:
+                logger.error(f"Failed to export span to {self.path}: {str(e)}")
+
+
+class LatencyHistogram:
+    """HDR-style latency histogram with log-linear buckets
+
+    Values are recorded in microseconds. Each power-of-two range is split into
+    2**(SUB_BUCKET_BITS - 1) linear sub-buckets, which keeps the relative error
+    of any reported percentile below 1%.
+    """
+
+    SUB_BUCKET_BITS = 8
+
+    def __init__(self, name: str):
+        self.name = name
+        self.count = 0
+        self.total_us = 0
+        self.min_us = None
+        self.max_us = None
+        self._buckets: Dict[int, int] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def _bucket_floor(cls, value_us: int) -> int:
+        shift = max(0, value_us.bit_length() - cls.SUB_BUCKET_BITS)
+        return (value_us >> shift) << shift
+
+    @classmethod
+    def _bucket_width(cls, floor_us: int) -> int:
+        return 1 << max(0, floor_us.bit_length() - cls.SUB_BUCKET_BITS)
+
+    def record(self, seconds: float):
+        """Record a latency given in seconds"""
+        value_us = max(0, int(seconds * 1_000_000))
+        floor = self._bucket_floor(value_us)
+        with self._lock:
+            self._buckets[floor] = self._buckets.get(floor, 0) + 1
+            self.count += 1
+            self.total_us += value_us
+            self.min_us = value_us if self.min_us is None else min(self.min_us, value_us)
+            self.max_us = value_us if self.max_us is None else max(self.max_us, value_us)
+
+    def percentile(self, p: float) -> float:
+        """Return the p-th percentile (0-100) in seconds"""
+        with self._lock:
+            if self.count == 0:
+                return 0.0
+            # Nearest rank; round() would send halves to the even rank
+            target = max(1, math.ceil(self.count * p / 100.0))
+            seen = 0
+            for floor in sorted(self._buckets):
+                seen += self._buckets[floor]
+                if seen >= target:
+                    width = self._bucket_width(floor)
+                    value_us = min(floor + (width - 1) / 2, self.max_us)
+                    return max(value_us, self.min_us) / 1_000_000
+            return self.max_us / 1_000_000
+
+    def cumulative_counts(self, bounds_seconds: List[float]) -> List[int]:
+        """Return the number of samples at or below each bound (Prometheus 'le' buckets)"""
+        with self._lock:
+            items = sorted(self._buckets.items())
+        counts = []
+        for bound in bounds_seconds:
+            bound_us = bound * 1_000_000
+            counts.append(sum(n for floor, n in items if floor + self._bucket_width(floor) - 1 <= bound_us))
+        return counts
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Summarize the histogram in milliseconds"""
+        if self.count == 0:
+            return {"count": 0}
+        return {
+            "count": self.count,
+            "min_ms": round(self.min_us / 1000, 3),
+            "mean_ms": round(self.total_us / self.count / 1000, 3),
+            "p50_ms": round(self.percentile(50) * 1000, 3),
+            "p90_ms": round(self.percentile(90) * 1000, 3),
+            "p95_ms": round(self.percentile(95) * 1000, 3),
+            "p99_ms": round(self.percentile(99) * 1000, 3),
+            "max_ms": round(self.max_us / 1000, 3)
+        }
+
+    def reset(self):
+        """Clear all recorded samples"""
+        with self._lock:
+            self.count = 0
+            self.total_us = 0
+            self.min_us = None
+            self.max_us = None
+            self._buckets.clear()
+
+
+class Tracer:
+    """Creates spans, exports them and keeps a latency histogram per span name"""
+
+    def __init__(self, service_name: str = "genie-chatbot", exporter=None):
+        self.service_name = service_name
+        self.exporter = exporter or NoOpSpanExporter()
+        self._histograms: Dict[str, LatencyHistogram] = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def start_as_current_span(self, name: str, **attributes) -> Iterator[Span]:
+        """Start a span as a child of the current one and make it current"""
+        span = Span(name, parent=_current_span.get(), attributes=attributes)
+        token = _current_span.set(span)
+        try:
+            yield span
+        except Exception as e:
+            span.record_exception(e)
+            raise
+        finally:
+            _current_span.reset(token)
+            span.end()
+            self.histogram(name).record(span.duration)
+            try:
+                self.exporter.export(span.to_dict({"service.name": self.service_name}))
+            except Exception as e:
+                logger.error(f"Failed to export span {name}: {str(e)}")
+
+    def histogram(self, name: str) -> LatencyHistogram:
+        """Get or create the latency histogram for a span name"""
+        with self._lock:
+            if name not in self._histograms:
+                self._histograms[name] = LatencyHistogram(name)
+            return self._histograms[name]
+
+    def histograms(self) -> Dict[str, LatencyHistogram]:
+        """Return all latency histograms keyed by span name"""
+        with self._lock:
+            return dict(self._histograms)
+
+    def latency_summary(self) -> Dict[str, Dict[str, Any]]:
+        """Return a snapshot of every latency histogram"""
+        return {name: hist.snapshot() for name, hist in sorted(self.histograms().items())}
+
+
+_tracer: Optional[Tracer] = None
+_tracer_lock = threading.Lock()
+
+
+def _build_exporter():
+    """Build the span exporter selected by TRACE_EXPORTER"""
+    exporter_name = os.getenv("TRACE_EXPORTER", "none").lower()
+    if exporter_name == "console":
+        return ConsoleSpanExporter()
+    if exporter_name == "jsonl":
+        return JsonLinesSpanExporter(os.getenv("TRACE_FILE", "traces.jsonl"))
+    return NoOpSpanExporter()
+
+
+def get_tracer() -> Tracer:
+    """Return the process-wide tracer"""
+    global _tracer
+    if _tracer is None:
+        with _tracer_lock:
+            if _tracer is None:
+                _tracer = Tracer(exporter=_build_exporter())
+    return _tracer
+
+
+def current_span() -> Optional[Span]:
+    """Return the active span, if any"""
+    return _current_span.get()
+
+
+def traced(name: str):
+    """Decorator that wraps a sync or async function in a span"""
+    def decorator(func):
+        if asyncio.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with get_tracer().start_as_current_span(name):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with get_tracer().start_as_current_span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
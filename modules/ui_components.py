@@ -2,6 +2,9 @@
 UI components and styling for the Genie chatbot
 """
 import streamlit as st
+from contextlib import contextmanager
+from typing import Dict, Any
+from .tracing import traced
 
 
 class UIComponents:
@@ -172,11 +175,15 @@ class UIComponents:
                 st.rerun()
     
     @staticmethod
-    def render_sidebar():
+    def render_sidebar(is_admin: bool = False):
         """Render the sidebar with sample questions"""
         from .config import Config
         
         with st.sidebar:
+            if is_admin:
+                st.toggle("📊 Painel de Administração", key="show_admin_panel")
+            st.toggle("📈 Gráficos automáticos", value=True, key="auto_chart",
+                      help="Desenha séries temporais e numéricas, reduzidas para poucos pontos")
             st.header("💡 Perguntas de Exemplo")
             for question in Config.SAMPLE_QUESTIONS:
                 if st.button(question, key=f"sample_{question}", use_container_width=True):
@@ -184,6 +191,7 @@ class UIComponents:
                     st.rerun()
     
     @staticmethod
+    @traced("ui.render_user_message")
     def render_user_message(content: str):
         """Render a user message"""
         st.markdown(f'''
@@ -193,6 +201,7 @@ class UIComponents:
         ''', unsafe_allow_html=True)
     
     @staticmethod
+    @traced("ui.render_bot_message")
     def render_bot_message(content: str):
         """Render a bot message with proper markdown support"""
         with st.container():
@@ -200,12 +209,116 @@ class UIComponents:
             st.markdown(content)
     
     @staticmethod
+    @traced("ui.render_chart")
+    def render_chart(chart: Dict[str, Any]):
+        """Render downsampled chart data built by the charting module"""
+        import pandas as pd
+        
+        if not chart["source_rows"]:
+            st.caption(f"📈 Nenhuma linha veio com a resposta; o gráfico precisa ler as {chart['total_rows']:,} linhas do resultado")
+            return
+        
+        frame = pd.DataFrame(chart["series"])
+        x = chart["x"]
+        if chart["x_type"] == "time":
+            x = pd.to_datetime(x, unit="ms", utc=True)
+        frame.insert(0, chart["x_name"], x)
+        st.line_chart(frame, x=chart["x_name"], y=list(chart["series"]))
+        caption = f"📈 {len(frame):,} pontos"
+        if chart["method"] != "none":
+            caption += f" ({chart['method']})"
+        total_rows = chart.get("total_rows", chart["source_rows"])
+        if chart["source_rows"] < total_rows:
+            caption += f", primeiras {chart['source_rows']:,} de {total_rows:,} linhas"
+        else:
+            caption += f" de {total_rows:,} linhas"
+        st.caption(caption)
+    
+    @staticmethod
+    def render_full_chart_button(statement_id: str) -> bool:
+        """Button that asks for a chart of the whole result instead of the inline rows"""
+        return st.button("📈 Gráfico com todas as linhas", key=f"full_chart_{statement_id}",
+                         help="Lê todos os blocos do resultado; pode levar alguns segundos")
+    
+    @staticmethod
+    def render_export_buttons(statement_id: str, export_result):
+        """Offer the full result of a statement as CSV or Parquet downloads
+        
+        export_result(statement_id, format) is only called when a button is
+        clicked, so rendering the chat never fetches the result chunks.
+        """
+        csv_column, parquet_column, _ = st.columns([1, 1, 4])
+        with csv_column:
+            st.download_button(
+                "⬇️ CSV", data=lambda: export_result(statement_id, "csv"),
+                file_name=f"genie_{statement_id}.csv", mime="text/csv",
+                key=f"export_csv_{statement_id}", on_click="ignore",
+                help="Baixar todas as linhas do resultado"
+            )
+        with parquet_column:
+            st.download_button(
+                "⬇️ Parquet", data=lambda: export_result(statement_id, "parquet"),
+                file_name=f"genie_{statement_id}.parquet", mime="application/vnd.apache.parquet",
+                key=f"export_parquet_{statement_id}", on_click="ignore",
+                help="Baixar todas as linhas do resultado"
+            )
+    
+    @staticmethod
+    @traced("ui.render_error_message")
     def render_error_message(content: str):
         """Render an error message"""
         with st.container():
             st.markdown("**🤖 Genie:**")
             st.error(content)
     
+    @staticmethod
+    @contextmanager
+    def progress_indicator():
+        """Show a progress bar and status line; yields a (fraction, text) callback"""
+        progress_bar = st.progress(0)
+        status_text = st.empty()
+        
+        def update(fraction: float, text: str):
+            progress_bar.progress(fraction)
+            status_text.text(text)
+        
+        try:
+            yield update
+        finally:
+            progress_bar.empty()
+            status_text.empty()
+    
+    @staticmethod
+    def render_admin_panel(snapshot: dict):
+        """Render the admin panel with operational counters"""
+        st.subheader("📊 Métricas Operacionais")
+        
+        col1, col2, col3, col4 = st.columns(4)
+        col1.metric("Sessões ativas", snapshot["active_sessions"])
+        col2.metric("Chamadas Genie em andamento", snapshot["in_flight_calls"])
+        col3.metric("Fila do executor", snapshot["queue_depth"])
+        ratio = snapshot["cache_hit_ratio"]
+        col4.metric("Cache hit ratio", f"{ratio:.1%}" if ratio is not None else "—",
+                    help=None if ratio is not None else "Nenhum cache instrumentado: reutilizar o serviço "
+                                                        "guardado na sessão a cada rerun não é um acerto de cache")
+        
+        col1, col2, col3 = st.columns(3)
+        col1.metric("Resultados em sessão", f"{snapshot['result_bytes'] / 1024:,.1f} KiB")
+        col2.metric("Tokens obtidos", snapshot["token_refreshes"])
+        col3.metric("Erros", int(sum(snapshot["errors_by_class"].values())))
+        
+        if snapshot["errors_by_class"]:
+            st.markdown("**Erros por classe**")
+            st.table([{"classe": name, "total": int(count)} for name, count in sorted(snapshot["errors_by_class"].items())])
+        
+        if snapshot["space_requests"]:
+            st.markdown("**Perguntas por espaço Genie**")
+            st.table([{"espaço": space, **outcomes} for space, outcomes in sorted(snapshot["space_requests"].items())])
+        
+        if snapshot["latency"]:
+            st.markdown("**Latência por etapa (ms)**")
+            st.table([{"etapa": stage, **stats} for stage, stats in snapshot["latency"].items()])
+    
     @staticmethod
     def render_footer():
         """Render the footer"""
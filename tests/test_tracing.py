@@ -0,0 +1,23 @@
+"""
+Tests for the latency histogram percentiles
+"""
+import pytest
+
+from modules.tracing import LatencyHistogram
+
+
+def histogram_of(*milliseconds: float) -> LatencyHistogram:
+    histogram = LatencyHistogram("test")
+    for value in milliseconds:
+        histogram.record(value / 1000)
+    return histogram
+
+
+@pytest.mark.parametrize("p, expected_ms", [(0, 1), (20, 1), (50, 3), (90, 5), (99, 5), (100, 5)])
+def test_percentile_uses_nearest_rank(p, expected_ms):
+    histogram = histogram_of(1, 2, 3, 4, 5)
+    assert histogram.percentile(p) == pytest.approx(expected_ms / 1000, rel=0.01)
+
+
+def test_percentile_of_empty_histogram_is_zero():
+    assert LatencyHistogram("test").percentile(50) == 0.0